@@ -10,9 +10,8 @@ import argparse
 
 def run_seeder(iterations: int):
     """Run the seeder to generate seed words and URLs."""
-    for i in range(1, iterations + 1):
-        print(f"Generating seed words and seed URLs for the {i} time ...")
-        subprocess.run(["python3", "./pipeline/seeder.py"], check=True)
+    print(f"Generating seed words and seed URLs {iterations} time(s) ...")
+    subprocess.run(["python3", "./pipeline/seeder.py", f"params.seeder_runs={iterations}"], check=True)
 
 
 def run_crawl(iterations: int):
@@ -25,17 +24,43 @@ def run_crawl(iterations: int):
     print("The crawling has been successfully concluded.")
 
 
-def construct_corpus():
+def construct_corpus(
+    workers: int = 1, shard: str = None, merge_shards: bool = False, since: str = None,
+    output_format: str = "text", export_text: bool = False
+):
     """Build the target document collection."""
     print("Constructing text corpus ...")
-    subprocess.run(["python3", "./pipeline/construct_corpus.py"], check=True)
+    overrides = [f"params.corpus_workers={workers}"]
+    if shard:
+        overrides.append(f"params.corpus_shard={shard}")
+    if merge_shards:
+        overrides.append("params.corpus_merge_shards=true")
+    if since:
+        overrides.append(f"params.corpus_since={since}")
+    overrides.append(f"params.corpus_output_format={output_format}")
+    if export_text:
+        overrides.append("params.corpus_export_text=true")
+    subprocess.run(["python3", "./pipeline/construct_corpus.py", *overrides], check=True)
     print("The corpus has been successfully generated.")
 
 
-def generate_statistics():
+def dump_nutch_links():
+    """Dump the Nutch linkdb and the parse data of the segments as plain text files."""
+    print("Dumping the Nutch linkdb and segments ...")
+    subprocess.run(
+        ["bash", "-c", "cd nutch && rm -rf crawl/dump && ./bin/nutch readlinkdb crawl/linkdb -dump crawl/dump/linkdb && "
+         "for segment in crawl/segments/*; do ./bin/nutch readseg -dump $segment crawl/dump/segments/$(basename $segment) "
+         "-nocontent -nofetch -nogenerate -noparse -noparsetext; done && cd .."], check=True)
+
+
+def generate_statistics(from_nutch: bool = False):
     """Generate statistics for the collection."""
     print("Generating statistics for the collection ...")
-    subprocess.run(["python3", "./pipeline/view_collection_stat.py"], check=True)
+    overrides = []
+    if from_nutch:
+        dump_nutch_links()
+        overrides.append("params.stats_source=nutch")
+    subprocess.run(["python3", "./pipeline/view_collection_stat.py", *overrides], check=True)
     print("The statistics have been successfully compiled.")
 
 
@@ -47,6 +72,13 @@ def main():
     parser.add_argument("--skip-crawl", action="store_true", help="Skip the crawling process")
     parser.add_argument("--skip-corpus", action="store_true", help="Skip corpus construction")
     parser.add_argument("--skip-stats", action="store_true", help="Skip collection statistics generation")
+    parser.add_argument("--stats-from-nutch", action="store_true", help="Count the links from the Nutch crawl data instead of fetching the pages")
+    parser.add_argument("--corpus-workers", type=int, default=1, help="Number of worker processes for corpus construction")
+    parser.add_argument("--corpus-shard", help="Shard of the collection processed by this machine, as i/N")
+    parser.add_argument("--merge-corpus-shards", action="store_true", help="Merge the corpus shard files into the final corpus")
+    parser.add_argument("--corpus-since", help="Only process the documents fetched since 'last' (the last successful run) or an ISO timestamp")
+    parser.add_argument("--corpus-format", choices=["text", "jsonl"], default="text", help="Output format of the final corpus")
+    parser.add_argument("--export-corpus-text", action="store_true", help="Export the JSONL shards of the final corpus to the text format")
 
     args = parser.parse_args()
 
@@ -58,10 +90,13 @@ def main():
         run_crawl(args.crawl_runs)
 
     if not args.skip_corpus:
-        construct_corpus()
+        construct_corpus(
+            args.corpus_workers, args.corpus_shard, args.merge_corpus_shards, args.corpus_since,
+            args.corpus_format, args.export_corpus_text
+        )
 
     if not args.skip_stats:
-        generate_statistics()
+        generate_statistics(args.stats_from_nutch)
 
 
 if __name__ == "__main__":
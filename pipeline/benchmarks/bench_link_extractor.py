@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import random
+import argparse
+from typing import List, Tuple
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common_utils.link_extractor import LinkExtractor, count_links  # noqa: E402
+
+#!/usr/bin/env python
+#
+# bench_link_extractor.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+Benchmark of the link counting of the collection statistics over a folder of saved HTML pages:
+BeautifulSoup tree (before) against the streaming LinkExtractor (after). Both must give the
+same outlink/inlink counts for every page.
+
+    python3 pipeline/benchmarks/bench_link_extractor.py --fixtures /tmp/html --generate 500
+"""
+
+WORDS = ["Timor", "Lorosa'e", "governu", "eleisaun", "povu", "hakarak", "dezenvolvimentu", "edukasaun", "saúde", "ekonomia"]
+
+
+def bs4_count_links(content: bytes, domain: str) -> Tuple[int, int]:
+    """The link counting before the LinkExtractor."""
+
+    soup = BeautifulSoup(content, 'html.parser')
+    hrefs = [link.get('href') for link in soup.find_all('a')]
+
+    return count_links(hrefs, domain)
+
+
+def generate_page(rng: random.Random, domain: str) -> str:
+    """Generates a news-like web page with navigation, article text, scripts and links."""
+
+    def link() -> str:
+        href = rng.choice([
+            f"https://{domain}/news/{rng.randrange(10000)}", f"/category/{rng.choice(WORDS)}",
+            f"http://ext{rng.randrange(50)}.com/page?a=1&amp;b=2", "#top", "javascript:void(0)",
+            f"https://www.{domain}/tag/{rng.randrange(100)}", "mailto:info@example.com", "",
+        ])
+        text = " ".join(rng.choices(WORDS, k=rng.randrange(1, 4)))
+        tag = rng.choice(["a", "a", "a", "A"])
+        return f'<{tag} href="{href}" class="link">{text}</{tag}>'
+
+    paragraphs = "".join(
+        f"<p>{' '.join(rng.choices(WORDS, k=rng.randrange(20, 80)))} {link()} &nbsp;&copy;</p>"
+        for _ in range(rng.randrange(5, 30))
+    )
+    navigation = "".join(f"<li>{link()}</li>" for _ in range(rng.randrange(10, 60)))
+
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Notísia</title>'
+        '<script>var x = "<a href=\\"/not-a-link\\">";</script>'
+        '<style>a { color: red; }</style></head><body>'
+        f'<nav><ul>{navigation}</ul></nav><!-- <a href="/commented">x</a> -->'
+        f'<main><article><h1>{" ".join(rng.choices(WORDS, k=6))}</h1>{paragraphs}</article></main>'
+        f'<footer><a name="bottom"></a><a href=/unquoted>x</a></footer></body></html>'
+    )
+
+
+def load_fixtures(fixtures_path: str) -> List[bytes]:
+    """Loads the saved HTML pages of the fixtures folder."""
+
+    pages = []
+    for folder, _, files in os.walk(fixtures_path):
+        for file in sorted(files):
+            if file.endswith((".html", ".htm")):
+                with open(os.path.join(folder, file), "rb") as page:
+                    pages.append(page.read())
+
+    return pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Link extraction benchmark")
+    parser.add_argument("--fixtures", required=True, help="Folder of saved HTML pages")
+    parser.add_argument("--generate", type=int, default=0, help="Generate this number of pages into the folder first")
+    parser.add_argument("--domain", default="tatoli.tl", help="Domain of the pages")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    if args.generate:
+        os.makedirs(args.fixtures, exist_ok=True)
+        rng = random.Random(args.seed)
+        for i in range(args.generate):
+            with open(os.path.join(args.fixtures, f"page_{i:05d}.html"), "w", encoding="utf-8") as page:
+                page.write(generate_page(rng, args.domain))
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f"No HTML pages found at: {args.fixtures}")
+        return
+    total_mb = sum(len(page) for page in pages) / 1048576
+    print(f"{len(pages)} pages, {total_mb:.1f} MB")
+
+    start = time.perf_counter()
+    before_counts = [bs4_count_links(page, args.domain) for page in pages]
+    before = time.perf_counter() - start
+
+    link_extractor = LinkExtractor()
+    start = time.perf_counter()
+    after_counts = [count_links(link_extractor.extract_hrefs(page), args.domain) for page in pages]
+    after = time.perf_counter() - start
+
+    for name, elapsed in (("before", before), ("after", after)):
+        print(f"{name:>8}: {len(pages) / elapsed:10,.0f} pages/sec, {total_mb / elapsed:6.1f} MB/sec")
+    mismatches = sum(1 for counts, expected in zip(after_counts, before_counts) if counts != expected)
+    print(f"speedup: {before / after:.1f}x, pages with different counts: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import logging
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+import contextlib
+import multiprocessing
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+PIPELINE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PIPELINE_PATH)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fixtures  # noqa: E402
+
+#!/usr/bin/env python
+#
+# bench_pipeline.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+End-to-end offline benchmark of the pipeline stages: seeder (seed words and seed urls, with a
+search fixture), corpus construction (GetCorpus over a fake Solr), collection statistics
+(CollectionStatistic over an HTML fixture server) and evaluation sampling (GetSampleCorpus).
+The corpus and the LID model are synthetic and generated in a work folder.
+
+Each stage runs in its own process, so its time and peak RSS are measured alone; the stage
+parameters are those of the **params** section of pipeline/conf/config.yaml. The results are
+printed and saved as JSON, with the commit, to be compared with the results of another run:
+
+    python3 pipeline/benchmarks/bench_pipeline.py --documents 20000 --output before.json
+    python3 pipeline/benchmarks/bench_pipeline.py --documents 20000 --output after.json --compare before.json
+"""
+
+STAGES = ["seeder", "corpus", "stats", "sample"]
+
+
+def load_params() -> dict:
+    """Loads the params section of the pipeline configuration."""
+
+    from omegaconf import OmegaConf
+
+    return OmegaConf.to_container(OmegaConf.load(os.path.join(PIPELINE_PATH, "conf", "config.yaml")).params)
+
+
+def measure(run: Callable[[], dict], documents: int, lines: int) -> dict:
+    """
+    Times a stage and gets its throughput and the peak RSS of the process. The stage can
+    return extra results, and the number of lines when it is only known once it has run.
+    """
+
+    start = time.perf_counter()
+    extra = run() or {}
+    seconds = time.perf_counter() - start
+    lines = extra.pop("lines", lines)
+
+    return dict({
+        "seconds": round(seconds, 3),
+        "documents": documents,
+        "lines": lines,
+        "documents_per_second": round(documents / seconds, 1) if seconds else 0.0,
+        "lines_per_second": round(lines / seconds, 1) if seconds else 0.0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }, **extra)
+
+
+def count_corpus(corpus_file_path: str) -> tuple:
+    """Counts the documents and the content lines of the final corpus."""
+
+    from common_utils.utils import CorpusReader
+
+    documents, lines = 0, 0
+    for _, _, text_lines in CorpusReader(corpus_file_path):
+        documents += 1
+        lines += sum(1 for line in text_lines if line)
+
+    return documents, lines
+
+
+def bench_seeder(workdir: str, params: dict, options: dict) -> dict:
+    from common_utils.search_backend import FixtureSearchBackend, SearchFanOut
+    from src.get_seed_url import GetSeedUrl
+    from src.get_seed_word import GetSeedWords
+
+    for file in ("seed_words.txt", "seed.txt", "domains.txt", "lid_verdict_cache.json"):
+        open(os.path.join(workdir, file), "w").close()
+    get_seed_word = GetSeedWords(
+        os.path.join(workdir, "initial_corpus.txt"), params["language"], params["corpus_sample_ratio"],
+        os.path.join(workdir, "lid_model.pkl"), params["lang_proba_threshold"], params["num_seed_word_sample"],
+        os.path.join(workdir, "seed_words.txt"), params["lid_mmap_mode"],
+        os.path.join(workdir, "lid_verdict_cache.json")
+    )
+    get_seed_url = GetSeedUrl(
+        params["extensions_to_exclude"], params["domains_to_exclude"], params["google_search_num_result"],
+        params["max_seed_url_length"], os.path.join(workdir, "seed.txt"), os.path.join(workdir, "domains.txt"),
+        SearchFanOut(FixtureSearchBackend(os.path.join(workdir, "search_fixture.json")), params["search_max_concurrency"])
+    )
+
+    def run() -> dict:
+        seed_queries = get_seed_word.generate_seed_queries(options["seed_queries"])
+        for seed_words, urls in zip(seed_queries, get_seed_url.search(seed_queries)):
+            get_seed_url.generate_seed_urls(seed_words, urls)
+        with open(os.path.join(workdir, "seed.txt"), encoding="utf-8") as seed_file:
+            return {"seed_queries": len(seed_queries), "seed_urls": sum(1 for _ in seed_file)}
+
+    documents = options["initial_documents"]
+    sampled_documents = int(params["corpus_sample_ratio"] * documents)
+
+    return measure(run, sampled_documents, sampled_documents)
+
+
+def bench_corpus(workdir: str, params: dict, options: dict) -> dict:
+    from src.get_corpus import GetCorpus
+
+    final_corpus_file_path = os.path.join(workdir, "final_corpus.txt")
+    for file in ("final_corpus.txt", "final_corpus.txt.idx", "dedup_index.bin"):
+        if os.path.exists(os.path.join(workdir, file)):
+            os.remove(os.path.join(workdir, file))
+    get_corpus = GetCorpus(
+        f"http://127.0.0.1:{options['solr_port']}/solr/nutch/select", 0, options["solr_rows"],
+        params["max_consecutive_newline"], params["language"], params["lang_proba_threshold"],
+        os.path.join(workdir, "lid_model.pkl"), final_corpus_file_path, params["lid_mmap_mode"],
+        params["lid_batch_size"], params["solr_paging"], params["write_buffer_size"],
+        params["solr_prefetch_pages"], os.path.join(workdir, "dedup_index.bin"), params["near_dup_threshold"],
+        params["near_dup_shingle_size"], params["near_dup_num_perm"], params["near_dup_max_documents"]
+    )
+
+    results = measure(get_corpus.generate_corpus, options["solr_documents"], options["solr_lines"])
+    results["saved_documents"], results["saved_lines"] = count_corpus(final_corpus_file_path)
+    results["stage_metrics"] = get_corpus.stage_metrics
+    results["metrics"] = get_corpus.metrics.to_dict()
+
+    return results
+
+
+def bench_stats(workdir: str, params: dict, options: dict) -> dict:
+    from src.collection_stat import CollectionStatistic
+
+    collection_stat = CollectionStatistic(
+        os.path.join(workdir, "final_corpus.txt"), os.path.join(workdir, "url_inlinks_outlinks.txt"),
+        os.path.join(workdir, "stat_inlinks_outlinks.txt"),
+        {
+            "max_workers": params["link_fetch_workers"],
+            "max_per_host": params["link_fetch_per_host"],
+            "connect_timeout": params["link_fetch_connect_timeout"],
+            "read_timeout": params["link_fetch_read_timeout"],
+            "total_timeout": params["link_fetch_total_timeout"],
+            "max_body_bytes": params["link_fetch_max_bytes"],
+        }
+    )
+    documents, lines = count_corpus(os.path.join(workdir, "final_corpus.txt"))
+
+    results = measure(collection_stat.generate_stats, documents, lines)
+    results["metrics"] = collection_stat.metrics.to_dict()
+
+    return results
+
+
+def bench_sample(workdir: str, params: dict, options: dict) -> dict:
+    from src.get_sample_corpus import GetSampleCorpus
+
+    sample_dir_path = os.path.join(workdir, "evaluation_sample")
+    os.makedirs(sample_dir_path, exist_ok=True)
+    get_sample_corpus = GetSampleCorpus(
+        os.path.join(workdir, "final_corpus.txt"), sample_dir_path, params["total_samples"], params["total_text_pages"])
+    documents = params["total_samples"] * params["total_text_pages"]
+
+    def run() -> dict:
+        get_sample_corpus.generate_sample()
+        lines = 0
+        for i in range(1, params["total_samples"] + 1):
+            with open(os.path.join(sample_dir_path, f"sample_{i}.txt"), encoding="utf-8") as sample_file:
+                lines += sum(1 for line in sample_file if line.strip())
+        return {"lines": lines}
+
+    return measure(run, documents, 0)
+
+
+def run_stage(stage: str, workdir: str, options: dict, results) -> None:
+    """
+    Runs a stage in this (child) process. The pipeline modules create their files relative
+    to the working directory, so they run in the work folder, and their output and logs are
+    silenced to measure the processing alone.
+    """
+
+    os.chdir(workdir)
+    sys.argv = sys.argv[:1]
+    logging.disable(logging.CRITICAL)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import src  # noqa: F401 (creates the pipeline files once, outside the measure)
+        logging.disable(logging.CRITICAL)
+        params = load_params()
+        results.put(globals()[f"bench_{stage}"](workdir, params, options))
+
+
+def get_stage_results(process: multiprocessing.Process, results) -> Optional[dict]:
+    """
+    Gets the results of a stage from its (child) process, before it is joined: the process
+    does not exit until its queued results are read, so joining it first can deadlock.
+
+    :param process: the process running the stage.
+    :param results: the queue of the results.
+    :return: the results, or None if the process exited without them.
+    """
+
+    while True:
+        is_alive = process.is_alive()
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            if not is_alive:
+                return None
+
+
+def prepare_workdir(workdir: str, args: argparse.Namespace, page_base_url: str) -> None:
+    """Generates the initial corpus, the LID model and the search fixture in the work folder."""
+
+    os.makedirs(os.path.join(workdir, "pipeline"), exist_ok=True)
+    conf_link = os.path.join(workdir, "pipeline", "conf")
+    if not os.path.exists(conf_link):
+        os.symlink(os.path.join(PIPELINE_PATH, "conf"), conf_link)
+    fixtures.generate_initial_corpus(os.path.join(workdir, "initial_corpus.txt"), args.initial_documents, args.seed)
+    fixtures.train_lid_model(os.path.join(workdir, "lid_model.pkl"), args.seed)
+    fixtures.generate_search_fixture(os.path.join(workdir, "search_fixture.json"), page_base_url, seed=args.seed)
+
+
+def get_commit() -> str:
+    """Gets the current commit, with a "-dirty" suffix for uncommitted changes."""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PIPELINE_PATH, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=PIPELINE_PATH, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+    return f"{commit}-dirty" if status else commit
+
+
+def print_results(results: Dict[str, dict], baseline: Dict[str, dict] = None) -> None:
+    """Prints the results per stage, with the speedup and the RSS ratio against the baseline."""
+
+    header = f"{'stage':<8} {'seconds':>9} {'docs/sec':>12} {'lines/sec':>12} {'peak RSS MB':>12}"
+    print(header + (f" {'speedup':>8} {'RSS ratio':>10}" if baseline else ""))
+    for stage, metrics in results.items():
+        row = (
+            f"{stage:<8} {metrics['seconds']:>9.2f} {metrics['documents_per_second']:>12,.0f} "
+            f"{metrics['lines_per_second']:>12,.0f} {metrics['peak_rss_mb']:>12.0f}"
+        )
+        if baseline and stage in baseline:
+            row += (
+                f" {baseline[stage]['seconds'] / metrics['seconds']:>7.2f}x"
+                f" {metrics['peak_rss_mb'] / baseline[stage]['peak_rss_mb']:>9.2f}x"
+            )
+        print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end offline pipeline benchmark")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated stages among {STAGES}")
+    parser.add_argument("--documents", type=int, default=10000, help="Number of documents served by the fake Solr")
+    parser.add_argument("--initial-documents", type=int, default=20000, help="Number of documents of the initial corpus")
+    parser.add_argument("--seed-queries", type=int, default=20, help="Number of seed queries of the seeder")
+    parser.add_argument("--solr-rows", type=int, default=100, help="Number of documents per Solr page")
+    parser.add_argument("--html-delay", type=float, default=0.0, help="Latency (seconds) of the HTML fixture server")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the fixtures")
+    parser.add_argument("--workdir", help="Work folder (a temporary folder removed at the end by default)")
+    parser.add_argument("--output", help="JSON file of the results")
+    parser.add_argument("--compare", help="JSON file of the results of another run to compare with")
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown_stages = set(stages) - set(STAGES)
+    if unknown_stages:
+        parser.error(f"Unknown stages: {sorted(unknown_stages)}")
+    if ("stats" in stages or "sample" in stages) and "corpus" not in stages and not args.workdir:
+        parser.error("The stats and sample stages read the corpus of the corpus stage, run it or give its --workdir")
+
+    context = multiprocessing.get_context("spawn")
+    workdir = args.workdir or tempfile.mkdtemp(prefix="labadain-bench-")
+    servers: List[multiprocessing.Process] = []
+    try:
+        ready = context.Queue()
+        servers.append(context.Process(target=fixtures.serve_html, args=(args.html_delay, ready), daemon=True))
+        servers[-1].start()
+        page_base_url = f"http://127.0.0.1:{ready.get(timeout=60)}"
+        servers.append(context.Process(
+            target=fixtures.serve_solr, args=(args.documents, page_base_url, args.seed, ready), daemon=True))
+        servers[-1].start()
+        solr_port, solr_documents, solr_lines = ready.get(timeout=600)
+        prepare_workdir(workdir, args, page_base_url)
+
+        options = {
+            "solr_port": solr_port, "solr_documents": solr_documents, "solr_lines": solr_lines,
+            "solr_rows": args.solr_rows, "initial_documents": args.initial_documents,
+            "seed_queries": args.seed_queries,
+        }
+        results = {}
+        for stage in stages:
+            stage_results = context.Queue()
+            process = context.Process(target=run_stage, args=(stage, workdir, options, stage_results))
+            process.start()
+            stage_result = get_stage_results(process, stage_results)
+            process.join()
+            if process.exitcode != 0 or stage_result is None:
+                print(f"The {stage} stage failed with exit code {process.exitcode}.")
+                break
+            results[stage] = stage_result
+    finally:
+        for server in servers:
+            server.terminate()
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": vars(args),
+        "stages": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as compare_file:
+            baseline = json.load(compare_file)
+        print(f"Compared with {args.compare} (commit {baseline.get('commit')})")
+    print_results(results, baseline["stages"] if baseline else None)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import re
+import sys
+import html
+import time
+import random
+import argparse
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.fixtures import generate_sentence  # noqa: E402
+from common_utils.text_normalizer import TextNormalizer  # noqa: E402
+
+#!/usr/bin/env python
+#
+# bench_text_normalizer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+Micro-benchmark of the normalization of the content lines: lines/sec of the line-by-line
+cleaning used before the TextNormalizer (get_document_lines, before) against the TextNormalizer
+over each Solr page of documents (after). The lines of both must be the same.
+
+    python3 pipeline/benchmarks/bench_text_normalizer.py --documents 20000 --rows 100
+"""
+
+# Boilerplate lines of the pages, as extracted by Nutch (menus, share buttons, footers).
+BOILERPLATE = [
+    "Home", "Notísia", "Polítika", "Ekonomia", "Desportu", "Kontaktu", "Share", "Facebook Twitter WhatsApp",
+    "Copyright &copy; 2026. All rights reserved.", "Lee mós:", "Komentáriu", "Publika iha", "&nbsp;",
+]
+
+
+def remove_html_tags(text: str) -> str:
+    """The removal of the HTML tags before the TextNormalizer."""
+
+    clean = re.compile('<.*?>')
+    text = re.sub(clean, '', text)
+    clean_text = html.unescape(text)
+    return clean_text
+
+
+def get_document_lines(tetun_text: List[str], max_consecutive_newlines: int) -> List[str]:
+    """The line-by-line cleaning before the TextNormalizer."""
+
+    document_lines = []
+    consecutive_newlines = 0
+    seen_sentences = set()
+    for index, doc in enumerate(tetun_text):
+        text_line = remove_html_tags(doc.strip())
+        if text_line not in seen_sentences:
+            if len(text_line) == 0:
+                consecutive_newlines += 1
+            else:
+                consecutive_newlines = 0
+            if len(text_line) == 0 and consecutive_newlines == max_consecutive_newlines:
+                continue
+            else:
+                document_lines.append(text_line)
+                if index == len(tetun_text) - 1:
+                    document_lines.append("")
+                if len(text_line) > 0:
+                    seen_sentences.add(text_line)
+
+    return document_lines
+
+
+def generate_content(rng: random.Random) -> List[str]:
+    """
+    Generates the content lines of a Nutch document: menus and footers around the text,
+    runs of empty lines, indented and repeated lines, some residual tags and entities.
+    """
+
+    lines = rng.sample(BOILERPLATE[:6], 4) + [""] * rng.randint(0, 3)
+    for _ in range(rng.randint(5, 60)):
+        draw = rng.random()
+        if draw < 0.15:
+            lines.extend([""] * rng.randint(1, 4))
+        elif draw < 0.2:
+            lines.append(rng.choice(BOILERPLATE))
+        elif draw < 0.25 and lines:
+            lines.append(lines[-1])
+        else:
+            line = " ".join(generate_sentence(rng) for _ in range(rng.randint(1, 4)))
+            if rng.random() < 0.05:
+                line = f"<p>{line}</p>"
+            if rng.random() < 0.05:
+                line = line.replace(" e ", " &amp; ", 1)
+            lines.append(rng.choice(["", "", " ", "\t", "   "]) + line + rng.choice(["", "", " ", "\r"]))
+    lines.extend(rng.sample(BOILERPLATE[6:], 3))
+
+    return lines
+
+
+def measure(name: str, normalize: Callable[[List[List[str]]], List[List[str]]], pages: List[List[List[str]]]) -> tuple:
+    """Normalizes the pages of documents and prints the throughput."""
+
+    total_lines = sum(len(lines) for page in pages for lines in page)
+    start = time.perf_counter()
+    documents = [lines for page in pages for lines in normalize(page)]
+    elapsed = time.perf_counter() - start
+    print(f"{name:>8}: {total_lines / elapsed:12,.0f} lines/sec")
+
+    return elapsed, documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Content line normalization benchmark")
+    parser.add_argument("--documents", type=int, default=20000, help="Number of documents")
+    parser.add_argument("--rows", type=int, default=100, help="Documents per Solr page")
+    parser.add_argument("--max-consecutive-newlines", type=int, default=2, help="As max_consecutive_newline")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [generate_content(rng) for _ in range(args.documents)]
+    pages = [documents[i:i + args.rows] for i in range(0, len(documents), args.rows)]
+    print(f"{len(documents)} documents, {sum(map(len, documents))} lines, {len(pages)} pages")
+
+    text_normalizer = TextNormalizer(args.max_consecutive_newlines)
+    before, expected = measure(
+        "before", lambda page: [get_document_lines(lines, args.max_consecutive_newlines) for lines in page], pages)
+    after, normalized = measure("after", text_normalizer.normalize_batch, pages)
+    if normalized != expected:
+        raise AssertionError("The normalized lines differ from the line-by-line cleaning.")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import json
+import time
+import zlib
+import bisect
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+#!/usr/bin/env python
+#
+# fixtures.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+Offline fixtures of the benchmarks: a synthetic Tetun-like text generator, a tiny stand-in
+LID model trained on it, a fake Solr select API serving synthetic Nutch documents and a
+server of synthetic HTML pages for the collection statistics.
+"""
+
+TETUN_WORDS = """
+ha'u ita nia sira ami imi iha ho ba husi no maibé tanba atu hodi mak ne'e ne'ebé sei ona la
+laiha bele tenke hakarak halo hatene fó simu hakerek lee koalia rona haree mai la'o servisu
+moris uma eskola ospitál merkadu dalan rai tasi foho loron kalan tinan fulan semana ohin aban
+horiseik governu estadu nasaun povu ema labarik feto mane inan aman maun alin família
+komunidade suku aldeia munisípiu eleisaun partidu parlamentu ministru prezidente lei
+polítika ekonomia osan orsamentu dezenvolvimentu edukasaun saúde agrikultura hahán bee etu
+batar kafé boot ki'ik di'ak aat foun tuan barak uitoan furak moos kmanek lais neineik tebes
+liu hotu mós de'it ida rua tolu haat lima neen hitu ualu sia sanulu atus rihun oin kotuk
+laran li'ur leten okos nu'udar hanesan kona-ba tuir to'o hafoin molok durante agora
+""".split()
+
+OTHER_WORDS = {
+    "pt": """
+    o a os as de do da em no na um uma para com por que não mais como mas foi ao ele ela das
+    tem seu sua ou ser quando muito há nos já está eu também só pelo pela até isso entre era
+    depois sem mesmo aos ter seus quem nas esse eles estão você tinha foram essa nem suas meu
+    minha numa pelos elas havia seja qual será nós tenho lhe deles este dele governo país
+    escola casa trabalho cidade notícias desenvolvimento educação saúde economia
+    """.split(),
+    "en": """
+    the of and to in is was for that on with as he it by at from his an were are which this
+    be or has had not but have they you one their new after first its also who two been more
+    she time year government school house people country news city world market road water
+    """.split(),
+    "id": """
+    yang dan di ke dari ini itu untuk dengan tidak ada akan pada juga saya kami mereka dia
+    bisa sudah karena oleh sebagai dalam atau tetapi rumah sekolah pemerintah rakyat negara
+    baru besar kecil orang anak tahun hari berita kota jalan air pasar
+    """.split(),
+}
+
+SITES = ["tatoli.tl", "timorpost.tl", "jornal.tl", "tet.wikipedia.org", "en.wikipedia.org", "noticias.tl"]
+
+
+def generate_sentence(rng: random.Random, tetun_ratio: float = 0.75, min_words: int = 4, max_words: int = 18) -> str:
+    """Generates a Tetun sentence, or a sentence in another language with 1 - tetun_ratio chance."""
+
+    words = TETUN_WORDS if rng.random() < tetun_ratio else OTHER_WORDS[rng.choice(list(OTHER_WORDS))]
+    sentence = " ".join(rng.choices(words, k=rng.randint(min_words, max_words)))
+
+    return sentence[0].upper() + sentence[1:] + rng.choice([".", ".", ".", "?", "!"])
+
+
+def generate_initial_corpus(file_path: str, documents: int, seed: int = 1) -> int:
+    """
+    Writes an initial corpus of one document per line.
+
+    :return: the number of lines.
+    """
+
+    rng = random.Random(seed)
+    with open(file_path, "w", encoding="utf-8") as corpus_file:
+        for _ in range(documents):
+            corpus_file.write(" ".join(generate_sentence(rng, 0.9) for _ in range(rng.randint(1, 6))) + "\n")
+
+    return documents
+
+
+def train_lid_model(file_path: str, seed: int = 1, samples_per_language: int = 2000) -> None:
+    """
+    Trains and saves a tiny stand-in LID model (character n-grams and naive Bayes) with the
+    classes "tet", "pt", "en" and "id", compatible with TetunLid.
+    """
+
+    import joblib
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import make_pipeline
+
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for language, words in [("tet", TETUN_WORDS)] + list(OTHER_WORDS.items()):
+        for _ in range(samples_per_language):
+            texts.append(" ".join(rng.choices(words, k=rng.randint(1, 12))))
+            labels.append(language)
+    lid_model = make_pipeline(CountVectorizer(analyzer="char_wb", ngram_range=(1, 3)), MultinomialNB())
+    lid_model.fit(texts, labels)
+    joblib.dump(lid_model, file_path)
+
+
+def generate_solr_documents(documents: int, page_base_url: str, seed: int = 1) -> List[dict]:
+    """
+    Generates Nutch documents as indexed in Solr (id, url, title, content, tstamp), with the
+    cases handled by the corpus construction: non-Tetun, missing or repeated titles, feed and
+    tag urls, empty contents, HTML tags, blank and repeated lines, and near-duplicate pages.
+    The urls point to the pages of the HTML fixture server at page_base_url.
+    """
+
+    rng = random.Random(seed)
+    docs = []
+    for i in range(documents):
+        site = rng.choice(SITES)
+        path = rng.choice(["news", "news", "artigu", "feed", "tag"]) if rng.random() < 0.1 else "news"
+        doc = {
+            "id": f"doc{i:09d}",
+            "url": f"{page_base_url}/{site}/{path}/{i}.html",
+            "tstamp": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T00:00:00Z",
+        }
+        if rng.random() > 0.02:
+            doc["title"] = generate_sentence(rng, 0.8, 3, 8)[:-1]
+        if docs and rng.random() < 0.02 and "title" in docs[-1]:
+            doc["title"] = docs[-1]["title"]
+        lines = []
+        for _ in range(rng.randint(3, 40)):
+            draw = rng.random()
+            if draw < 0.1:
+                lines.append("")
+            elif draw < 0.15 and lines:
+                lines.append(lines[-1])
+            else:
+                line = " ".join(generate_sentence(rng) for _ in range(rng.randint(1, 3)))
+                lines.append(f"<b>{line}</b>" if rng.random() < 0.05 else line)
+        if rng.random() > 0.02:
+            doc["content"] = "\n".join(lines)
+        if i % 50 == 49 and docs and docs[-1].get("content"):
+            doc["content"] = docs[-1]["content"] + "\n" + generate_sentence(rng, 1.0)
+        docs.append(doc)
+
+    return docs
+
+
+class FakeSolrHandler(BaseHTTPRequestHandler):
+    """
+    Solr select API over in-memory documents sorted by id: q=*:*, rows, start or cursorMark
+    (sorted on id), and the fq filters used by the corpus construction ({!hash ...} and tstamp).
+    """
+
+    docs: List[dict] = []
+    ids: List[str] = []
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def filter_documents(self, filter_queries: List[str]) -> List[dict]:
+        docs = self.docs
+        for filter_query in filter_queries:
+            if filter_query.startswith("{!hash"):
+                params = dict(param.split("=") for param in filter_query[2:-1].split()[1:])
+                workers, worker = int(params["workers"]), int(params["worker"])
+                docs = [doc for doc in docs if zlib.crc32(doc["id"].encode()) % workers == worker]
+            elif filter_query.startswith("tstamp:"):
+                since = filter_query[len("tstamp:") + 1:].split(" TO ")[0].strip('"')
+                docs = [doc for doc in docs if doc["tstamp"] > since]
+        return docs
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlsplit(self.path).query)
+        rows = int(query.get("rows", ["10"])[0])
+        filter_queries = query.get("fq", [])
+        docs = self.filter_documents(filter_queries) if filter_queries else self.docs
+        body = {"responseHeader": {"status": 0}, "response": {"numFound": len(docs)}}
+        if "cursorMark" in query:
+            cursor_mark = query["cursorMark"][0]
+            if filter_queries:
+                page = [doc for doc in docs if cursor_mark == "*" or doc["id"] > cursor_mark][:rows]
+            else:
+                start = 0 if cursor_mark == "*" else bisect.bisect_right(self.ids, cursor_mark)
+                page = docs[start:start + rows]
+            body["nextCursorMark"] = page[-1]["id"] if page else cursor_mark
+        else:
+            start = int(query.get("start", ["0"])[0])
+            page = docs[start:start + rows]
+        body["response"]["docs"] = page
+
+        response = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+
+class HtmlFixtureHandler(BaseHTTPRequestHandler):
+    """
+    Synthetic HTML pages, the same for the same path: navigation, paragraphs and a mix of
+    outlinks, inlinks, fragments and mailto links. One page in 29 is missing (404), and each
+    response can be delayed to simulate the network latency.
+    """
+
+    delay = 0.0
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        key = zlib.crc32(self.path.encode())
+        if key % 29 == 0:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.delay:
+            time.sleep(self.delay)
+
+        rng = random.Random(key)
+        host = self.headers.get("Host", "localhost")
+
+        def link() -> str:
+            href = rng.choice([
+                f"https://{rng.choice(SITES)}/news/{rng.randrange(100000)}.html",
+                f"http://{host}/{rng.choice(SITES)}/news/{rng.randrange(100000)}.html",
+                f"/category/{rng.choice(TETUN_WORDS)}", "#top", "mailto:info@example.tl",
+            ])
+            return f'<a href="{href}">{rng.choice(TETUN_WORDS)}</a>'
+
+        navigation = "".join(f"<li>{link()}</li>" for _ in range(rng.randint(5, 40)))
+        paragraphs = "".join(f"<p>{generate_sentence(rng)} {link()}</p>" for _ in range(rng.randint(3, 30)))
+        body = (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Notísia</title></head><body>'
+            f"<nav><ul>{navigation}</ul></nav><main><article>{paragraphs}</article></main></body></html>"
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(handler: type) -> ThreadingHTTPServer:
+    """Starts a threaded HTTP server on a free local port, in a daemon thread."""
+
+    ThreadingHTTPServer.request_queue_size = 256
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def serve_solr(documents: int, page_base_url: str, seed: int, ready) -> None:
+    """
+    Serves the synthetic documents through the fake Solr API until the process is terminated.
+    The port, the number of documents and the number of content lines are sent to ready.
+    """
+
+    docs = generate_solr_documents(documents, page_base_url, seed)
+    FakeSolrHandler.docs = docs
+    FakeSolrHandler.ids = [doc["id"] for doc in docs]
+    total_lines = sum(doc["content"].count("\n") + 1 for doc in docs if "content" in doc)
+    server = start_server(FakeSolrHandler)
+    ready.put((server.server_port, len(docs), total_lines))
+    threading.Event().wait()
+
+
+def serve_html(delay: float, ready) -> None:
+    """Serves the synthetic HTML pages until the process is terminated. The port is sent to ready."""
+
+    HtmlFixtureHandler.delay = delay
+    server = start_server(HtmlFixtureHandler)
+    ready.put(server.server_port)
+    threading.Event().wait()
+
+
+def generate_search_fixture(file_path: str, page_base_url: str, urls: int = 50, seed: int = 1) -> None:
+    """Writes a search fixture (see FixtureSearchBackend) answering every query with the same urls."""
+
+    rng = random.Random(seed)
+    results = [
+        rng.choice([
+            f"https://{rng.choice(SITES)}/news/{rng.randrange(100000)}.html",
+            f"https://www.youtube.com/watch?v={rng.randrange(100000)}",
+            f"https://{rng.choice(SITES)}/files/{rng.randrange(1000)}.pdf",
+            f"{page_base_url}/{rng.choice(SITES)}/news/{rng.randrange(100000)}.html",
+        ])
+        for _ in range(urls)
+    ]
+    with open(file_path, "w", encoding="utf-8") as fixture_file:
+        json.dump({"*": results}, fixture_file)
+
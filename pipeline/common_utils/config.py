@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 #!/usr/bin/env python
 #
@@ -17,6 +17,9 @@ class Paths:
     nutch: str
     lid: str
     eval_sample: str
+    nutch_linkdb_dump: str
+    nutch_segment_dump: str
+    metrics: str
 
 
 @dataclass
@@ -27,6 +30,9 @@ class Files:
     domain: str
     lid_model: str
     final_corpus: str
+    dedup_index: str
+    corpus_checkpoint: str
+    lid_verdict_cache: str
     stats_in_out_links: str
     url_in_out_links: str
     file_names: List[str]
@@ -37,13 +43,50 @@ class Params:
     solr_api_url: str
     solr_start: int
     solr_rows: int
+    solr_paging: str
+    solr_prefetch_pages: int
+    solr_connect_timeout: float
+    solr_read_timeout: float
     language: str
     lang_proba_threshold: float
+    lid_mmap_mode: Optional[str]
+    lid_batch_size: int
     corpus_sample_ratio: float
     num_seed_word_sample: int
+    seeder_runs: int
     google_search_num_result: int
+    search_backend: str
+    search_fixture_file: Optional[str]
+    search_max_concurrency: int
+    search_rate_per_second: Optional[float]
+    search_burst: int
     max_seed_url_length: int
     max_consecutive_newline: int
+    text_normalization_stages: List[str]
+    write_buffer_size: int
+    corpus_workers: int
+    corpus_shard: Optional[str]
+    corpus_merge_shards: bool
+    corpus_checkpoint_pages: int
+    corpus_since: Optional[str]
+    corpus_output_format: str
+    corpus_output_compression: str
+    corpus_output_shard_size: int
+    corpus_export_text: bool
+    near_dup_threshold: Optional[float]
+    near_dup_shingle_size: int
+    near_dup_num_perm: int
+    near_dup_max_documents: int
+    stats_source: str
+    link_fetch_workers: int
+    link_fetch_per_host: int
+    link_fetch_connect_timeout: float
+    link_fetch_read_timeout: float
+    link_fetch_total_timeout: float
+    link_fetch_max_bytes: int
+    metrics_format: Optional[str]
+    profile_stages: bool
+    document_log_every: int
     total_samples: int
     total_text_pages: int
     extensions_to_exclude: List[str]
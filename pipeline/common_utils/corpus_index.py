@@ -0,0 +1,154 @@
+import os
+import numpy as np
+from typing import List, Tuple
+
+#!/usr/bin/env python
+#
+# corpus_index.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+Sidecar offset index of the corpus files: a flat binary array of little-endian uint64
+(offset, length) pairs, one per text separated by a blank line (the documents, as read by
+CorpusReader), where the length covers the text and the blank line after it; a last text
+not followed by a blank line is indexed up to the end of the file. The index of <corpus>
+is stored at <corpus>.idx.
+"""
+
+INDEX_DTYPE = np.dtype("<u8")
+ENTRY_BYTES = 2 * INDEX_DTYPE.itemsize
+
+
+def get_index_file_path(corpus_file_path: str) -> str:
+    """Gets the path of the offset index of a corpus file."""
+    return f"{corpus_file_path}.idx"
+
+
+def encode_entries(entries: List[List[int]]) -> bytes:
+    """Encodes (offset, length) pairs as index entries."""
+    return np.asarray(entries, dtype=INDEX_DTYPE).tobytes()
+
+
+def index_texts(start: int, data: bytes) -> Tuple[List[Tuple[int, int]], int, bytes]:
+    """
+    Splits bytes of a corpus file on the blank lines, into the index entries of the texts
+    followed by a blank line (the texts only made of newlines are skipped).
+
+    :param start: the offset of the data in the corpus file, just after a blank line.
+    :param data: the bytes of the corpus file.
+    :return: the index entries, and the offset and bytes of the rest of the data after the last blank line.
+    """
+
+    entries = []
+    texts = data.split(b"\n\n")
+    pending = texts.pop()
+    for text in texts:
+        if text.strip(b"\n"):
+            entries.append((start, len(text) + 2))
+        start += len(text) + 2
+
+    return entries, start, pending
+
+
+def load_corpus_index(index_file_path: str) -> np.ndarray:
+    """
+    Memory-maps an offset index, without reading it into memory.
+
+    :param index_file_path: the index file.
+    :return: an array of shape (documents, 2) holding the offset and length of each document.
+    """
+
+    if os.path.getsize(index_file_path) == 0:
+        return np.zeros((0, 2), dtype=INDEX_DTYPE)
+    return np.memmap(index_file_path, dtype=INDEX_DTYPE, mode="r").reshape(-1, 2)
+
+
+def is_valid_corpus_index(corpus_file_path: str, index_file_path: str) -> bool:
+    """Checks that the offset index exists and covers the corpus file up to its end."""
+
+    if not os.path.exists(corpus_file_path) or not os.path.exists(index_file_path):
+        return False
+    index_size = os.path.getsize(index_file_path)
+    if index_size % ENTRY_BYTES:
+        return False
+    corpus_size = os.path.getsize(corpus_file_path)
+    if index_size == 0:
+        return corpus_size == 0
+    offset, length = load_corpus_index(index_file_path)[-1]
+
+    return int(offset) + int(length) == corpus_size
+
+
+def build_corpus_index(corpus_file_path: str, index_file_path: str, chunk_size: int = 1048576) -> int:
+    """
+    Builds the offset index of an existing corpus file in a single streaming pass, taking
+    the texts separated by a blank line as documents. The index is written to a temporary
+    file that atomically replaces the index file.
+
+    :param corpus_file_path: the corpus file.
+    :param index_file_path: the index file.
+    :param chunk_size: the number of bytes read at a time.
+    :return: the number of documents indexed.
+    """
+
+    total_documents = 0
+    tmp_index_file_path = f"{index_file_path}.tmp"
+    with open(corpus_file_path, "rb") as corpus_file, open(tmp_index_file_path, "wb") as index_file:
+        start, pending = 0, b""
+        for chunk in iter(lambda: corpus_file.read(chunk_size), b""):
+            entries, start, pending = index_texts(start, pending + chunk)
+            if entries:
+                index_file.write(encode_entries(entries))
+                total_documents += len(entries)
+        if pending.strip(b"\n"):
+            index_file.write(encode_entries([(start, len(pending))]))
+            total_documents += 1
+    os.replace(tmp_index_file_path, index_file_path)
+
+    return total_documents
+
+
+def pop_corpus_index_tail(corpus_file_path: str, index_file_path: str) -> Tuple[int, bytes]:
+    """
+    Drops the index entry of a last text of the corpus file not followed by a blank line,
+    since the documents appended to the file continue that text, and gets the rest of the
+    file after the last blank line. The index must cover the corpus file up to its end.
+
+    :param corpus_file_path: the corpus file.
+    :param index_file_path: the index file.
+    :return: the offset and bytes of the rest of the corpus file after the last blank line.
+    """
+
+    index = load_corpus_index(index_file_path)
+    total_documents = len(index)
+    start = int(index[-1].sum()) if total_documents else 0
+    with open(corpus_file_path, "rb") as corpus_file:
+        if total_documents:
+            offset, length = (int(value) for value in index[-1])
+            corpus_file.seek(offset)
+            if not corpus_file.read(length).endswith(b"\n\n"):
+                total_documents -= 1
+                start = offset
+        corpus_file.seek(start)
+        pending = corpus_file.read()
+    del index
+    if os.path.getsize(index_file_path) > total_documents * ENTRY_BYTES:
+        os.truncate(index_file_path, total_documents * ENTRY_BYTES)
+
+    return start, pending
+
+
+def truncate_corpus_index(index_file_path: str, corpus_offset: int) -> None:
+    """Drops the index entries of the documents past the end of a truncated corpus file."""
+
+    if not os.path.exists(index_file_path):
+        return
+    index = load_corpus_index(index_file_path)
+    total_documents = int(np.searchsorted(index[:, 0], corpus_offset, side="left"))
+    if total_documents and int(index[total_documents - 1].sum()) > corpus_offset:
+        total_documents -= 1
+    del index
+    if os.path.getsize(index_file_path) > total_documents * ENTRY_BYTES:
+        os.truncate(index_file_path, total_documents * ENTRY_BYTES)
@@ -0,0 +1,92 @@
+import os
+import hashlib
+import numpy as np
+from urllib.parse import urlsplit, urlunsplit
+
+#!/usr/bin/env python
+#
+# dedup_index.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+class DedupIndex:
+    """
+    Persistent index of the documents already processed by the corpus construction.
+
+    The index keeps the 64-bit hashes of the normalized URLs, titles and contents in a set
+    for O(1) membership checks. On disk, it is a flat append-only file of little-endian
+    uint64 hashes, loaded with a single read and extended only with the new hashes.
+    Without an index file path, the index is kept in memory only.
+    """
+
+    def __init__(self, index_file_path: str) -> None:
+        self.index_file_path = index_file_path
+        self.hashes = set()
+        self.new_hashes = []
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def load(self) -> "DedupIndex":
+        """Loads the hashes saved by the previous runs."""
+
+        self.hashes = set()
+        if self.index_file_path is not None and os.path.exists(self.index_file_path):
+            self.hashes = set(np.fromfile(self.index_file_path, dtype="<u8").tolist())
+        self.new_hashes = []
+
+        return self
+
+    def save(self) -> None:
+        """Appends the hashes added since the last save to the index file."""
+
+        if self.new_hashes and self.index_file_path is not None:
+            with open(self.index_file_path, "ab") as index_file:
+                index_file.write(np.array(self.new_hashes, dtype="<u8").tobytes())
+            self.new_hashes = []
+
+    def contains(self, kind: str, text: str) -> bool:
+        """
+        Checks if a text of the given kind ("url", "title" or "content") is in the index.
+        """
+
+        return get_hash(kind, text) in self.hashes
+
+    def add(self, kind: str, text: str) -> bool:
+        """
+        Adds a text of the given kind ("url", "title" or "content") to the index.
+
+        :return: True if the text is new, False if it was already in the index.
+        """
+
+        key = get_hash(kind, text)
+        if key in self.hashes:
+            return False
+        self.hashes.add(key)
+        self.new_hashes.append(key)
+
+        return True
+
+
+def normalize_text(kind: str, text: str) -> str:
+    """
+    Normalizes a url (lower-cased scheme and host, no fragment nor trailing slash),
+    a title or a content (case-folded, with collapsed whitespaces).
+    """
+
+    if kind == "url":
+        parts = urlsplit(text.strip())
+        return urlunsplit((
+            parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""
+        ))
+
+    return " ".join(text.split()).casefold()
+
+
+def get_hash(kind: str, text: str) -> int:
+    """Gets the 64-bit hash of a normalized text of the given kind."""
+
+    normalized_text = f"{kind}:{normalize_text(kind, text)}".encode("utf-8")
+
+    return int.from_bytes(hashlib.blake2b(normalized_text, digest_size=8).digest(), "little")
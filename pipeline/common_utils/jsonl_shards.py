@@ -0,0 +1,258 @@
+import io
+import os
+import gzip
+import json
+import hashlib
+from typing import Iterator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#!/usr/bin/env python
+#
+# jsonl_shards.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+Compressed JSONL shards of the final corpus, with one record per document:
+<prefix>-00000.jsonl.gz (or .jsonl.zst), <prefix>-00001.jsonl.gz, ..., described by the
+manifest <prefix>.manifest.json:
+
+    {"compression": "gzip", "total_documents": 2,
+     "shards": [{"file": "final_corpus-00000.jsonl.gz", "documents": 2, "bytes": 1234,
+                 "compressed_bytes": 456, "sha256": "..."}]}
+
+Each buffer is written as an independent gzip member (or zstd frame), so a shard truncated
+back to a checkpoint remains a valid compressed file.
+"""
+
+SHARD_EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def get_manifest_file_path(output_prefix: str) -> str:
+    """Gets the path of the manifest of the shards."""
+    return f"{output_prefix}.manifest.json"
+
+
+def get_shard_file_path(output_prefix: str, shard_index: int, compression: str) -> str:
+    """Gets the path of a shard."""
+    if compression not in SHARD_EXTENSIONS:
+        raise ValueError(f"Unknown compression: {compression}, expected one of {list(SHARD_EXTENSIONS)}")
+    return f"{output_prefix}-{shard_index:05d}{SHARD_EXTENSIONS[compression]}"
+
+
+def load_manifest(output_prefix: str, compression: str = "gzip") -> dict:
+    """Loads the manifest of the shards, or an empty one if there is none."""
+
+    manifest_file_path = get_manifest_file_path(output_prefix)
+    if not os.path.exists(manifest_file_path) or os.path.getsize(manifest_file_path) == 0:
+        return {"compression": compression, "total_documents": 0, "shards": []}
+    with open(manifest_file_path, "r", encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
+
+
+def save_manifest(output_prefix: str, manifest: dict) -> None:
+    """Saves the manifest of the shards through a temporary file."""
+
+    manifest["total_documents"] = sum(shard["documents"] for shard in manifest["shards"])
+    manifest_file_path = get_manifest_file_path(output_prefix)
+    with open(f"{manifest_file_path}.tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(f"{manifest_file_path}.tmp", manifest_file_path)
+
+
+def get_sha256(file_path: str, chunk_size: int = 1048576) -> str:
+    """Gets the SHA-256 checksum of a file."""
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as read_file:
+        for chunk in iter(lambda: read_file.read(chunk_size), b""):
+            sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    """Compresses data as a single gzip member or zstd frame."""
+
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("The zstd compression requires the zstandard package.")
+        return zstandard.ZstdCompressor(level=3).compress(data)
+
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def open_shard(shard_file_path: str) -> io.TextIOBase:
+    """Opens a shard for reading its lines, whatever the number of gzip members or zstd frames."""
+
+    if shard_file_path.endswith(SHARD_EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise ImportError("The zstd compression requires the zstandard package.")
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(shard_file_path, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+
+    return gzip.open(shard_file_path, "rt", encoding="utf-8")
+
+
+def iter_jsonl_records(output_prefix: str) -> Iterator[dict]:
+    """
+    Reads the records of the shards listed in the manifest, in order.
+
+    :param output_prefix: the path prefix of the shards.
+    :return: an iterator of records.
+    """
+
+    output_folder = os.path.dirname(output_prefix)
+    for shard in load_manifest(output_prefix)["shards"]:
+        with open_shard(os.path.join(output_folder, shard["file"])) as shard_file:
+            for line in shard_file:
+                yield json.loads(line)
+
+
+def truncate_jsonl_shards(output_prefix: str, position: dict) -> None:
+    """
+    Restores the shards to a position returned by JsonlShardWriter.get_position: the shards
+    written after it are removed from the manifest and deleted, and the shard being written
+    at that position is truncated back to its size.
+    """
+
+    manifest = load_manifest(output_prefix, position["compression"])
+    if len(manifest["shards"]) > position["shard"]:
+        manifest["shards"] = manifest["shards"][:position["shard"]]
+        save_manifest(output_prefix, manifest)
+    shard_index = position["shard"]
+    while True:
+        shard_file_path = get_shard_file_path(output_prefix, shard_index, position["compression"])
+        if not os.path.exists(shard_file_path):
+            break
+        if shard_index == position["shard"]:
+            if os.path.getsize(shard_file_path) > position["offset"]:
+                os.truncate(shard_file_path, position["offset"])
+        else:
+            os.remove(shard_file_path)
+        shard_index += 1
+
+
+class JsonlShardWriter:
+    """
+    Long-lived buffered writer of the compressed JSONL shards, used as a context manager,
+    with the same document boundaries as the CorpusWriter.
+
+    The records are kept in memory and compressed in batches of about buffer_size bytes;
+    a shard is closed once it holds shard_size (uncompressed) bytes, and its document count
+    and checksum are added to the manifest. The shards of earlier runs are kept, and the
+    writer starts a new shard after them, or goes on with the shard of a position to resume.
+    """
+
+    def __init__(
+        self,
+        output_prefix: str,
+        shard_size: int = 268435456,
+        compression: str = "gzip",
+        buffer_size: int = 1048576,
+        position: dict = None
+    ) -> None:
+        self.output_prefix = output_prefix
+        self.shard_size = shard_size
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.position = position
+        self.manifest = None
+        self.shard_index = 0
+        self.shard_file = None
+        self.shard_documents = 0
+        self.shard_bytes = 0
+        self.buffer = []
+        self.buffer_bytes = 0
+        if compression not in SHARD_EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}, expected one of {list(SHARD_EXTENSIONS)}")
+
+    def __enter__(self) -> "JsonlShardWriter":
+        self.manifest = load_manifest(self.output_prefix, self.compression)
+        if self.manifest["compression"] != self.compression:
+            raise ValueError(
+                f"The shards at {self.output_prefix} are compressed with {self.manifest['compression']}.")
+        self.shard_index = len(self.manifest["shards"])
+        if self.position is not None and self.position["shard"] == self.shard_index:
+            self.shard_documents = self.position["documents"]
+            self.shard_bytes = self.position["bytes"]
+            self.start_shard("ab")
+        else:
+            self.start_shard("wb")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def start_shard(self, mode: str) -> None:
+        shard_file_path = get_shard_file_path(self.output_prefix, self.shard_index, self.compression)
+        self.shard_file = open(shard_file_path, mode, buffering=0)
+        self.shard_file.seek(0, os.SEEK_END)
+
+    def write_record(self, record: dict) -> None:
+        """Write a record (buffered), flushing the buffer once it is full."""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self.buffer.append(line)
+        self.buffer_bytes += len(line)
+        if self.buffer_bytes >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the records held in the buffer to the current shard, rotating it once it is full."""
+        if self.buffer:
+            self.shard_file.write(compress(b"".join(self.buffer), self.compression))
+            self.shard_documents += len(self.buffer)
+            self.shard_bytes += self.buffer_bytes
+            self.buffer = []
+            self.buffer_bytes = 0
+        if self.shard_bytes >= self.shard_size:
+            self.close_shard()
+            self.shard_index += 1
+            self.shard_documents = 0
+            self.shard_bytes = 0
+            self.start_shard("wb")
+
+    def close_shard(self) -> None:
+        """Close the current shard and add it to the manifest, or delete it if it is empty."""
+        self.shard_file.close()
+        self.shard_file = None
+        shard_file_path = get_shard_file_path(self.output_prefix, self.shard_index, self.compression)
+        if self.shard_documents == 0:
+            os.remove(shard_file_path)
+            return
+        self.manifest["shards"].append({
+            "file": os.path.basename(shard_file_path),
+            "documents": self.shard_documents,
+            "bytes": self.shard_bytes,
+            "compressed_bytes": os.path.getsize(shard_file_path),
+            "sha256": get_sha256(shard_file_path)
+        })
+        save_manifest(self.output_prefix, self.manifest)
+
+    def get_position(self) -> dict:
+        """Gets the position of the writer once the buffer is flushed, for truncate_jsonl_shards."""
+        return {
+            "compression": self.compression,
+            "shard": self.shard_index,
+            "offset": self.shard_file.tell(),
+            "documents": self.shard_documents,
+            "bytes": self.shard_bytes
+        }
+
+    def close(self) -> None:
+        """
+        Close the writer: the buffered records, which are complete documents, are written
+        and the last shard is added to the manifest, even when the run failed.
+        """
+        if self.shard_file is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.close_shard()
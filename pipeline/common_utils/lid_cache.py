@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+#!/usr/bin/env python
+#
+# lid_cache.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+class LidVerdictCache:
+    """
+    Persistent cache of the LID verdicts (accepted as Tetun or not) of single tokens.
+
+    The verdict of a token only depends on the LID model, the language and the probability
+    threshold, so the cache is stored with the hash of the model file and both settings, and
+    it is discarded as soon as one of them changes. The cache file is a JSON object, replaced
+    atomically on save. Without a cache file path, the cache is kept in memory only.
+    """
+
+    def __init__(
+        self,
+        cache_file_path: Optional[str],
+        lid_model_file_path: str,
+        tetun_lang: str,
+        lang_proba_threshold: float
+    ) -> None:
+        self.cache_file_path = cache_file_path
+        self.lid_model_file_path = lid_model_file_path
+        self.tetun_lang = tetun_lang
+        self.lang_proba_threshold = lang_proba_threshold
+        self.model_hash = None
+        self.verdicts: Dict[str, bool] = {}
+        self.is_updated = False
+
+    def get_key(self) -> Dict[str, object]:
+        """Gets the model hash and settings the verdicts are valid for."""
+
+        if self.model_hash is None:
+            self.model_hash = get_file_hash(self.lid_model_file_path)
+
+        return {
+            "model_hash": self.model_hash,
+            "tetun_lang": self.tetun_lang,
+            "lang_proba_threshold": self.lang_proba_threshold
+        }
+
+    def load(self) -> "LidVerdictCache":
+        """Loads the verdicts saved for the same model and settings, if any."""
+
+        self.verdicts = {}
+        self.is_updated = False
+        if self.cache_file_path is None or not os.path.exists(self.cache_file_path) \
+                or os.path.getsize(self.cache_file_path) == 0:
+            return self
+
+        try:
+            with open(self.cache_file_path, "r", encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(f"Ignoring the invalid LID verdict cache at: {self.cache_file_path}")
+            return self
+
+        if cache.get("key") == self.get_key():
+            self.verdicts = cache.get("verdicts", {})
+
+        return self
+
+    def save(self) -> None:
+        """Saves the verdicts, if new ones were added since the last load or save."""
+
+        if self.cache_file_path is None or not self.is_updated:
+            return
+        with open(f"{self.cache_file_path}.tmp", "w", encoding="utf-8") as cache_file:
+            json.dump({"key": self.get_key(), "verdicts": self.verdicts}, cache_file, ensure_ascii=False)
+        os.replace(f"{self.cache_file_path}.tmp", self.cache_file_path)
+        self.is_updated = False
+
+    def get_unknown_tokens(self, tokens: List[str]) -> List[str]:
+        """Gets the tokens without a cached verdict."""
+
+        return [token for token in tokens if token not in self.verdicts]
+
+    def update(self, tokens: List[str], verdicts: List[bool]) -> None:
+        """Adds the verdicts of the given tokens."""
+
+        for token, verdict in zip(tokens, verdicts):
+            self.verdicts[token] = bool(verdict)
+        self.is_updated = self.is_updated or len(tokens) > 0
+
+    def is_accepted(self, token: str) -> bool:
+        """Gets the cached verdict of a token."""
+
+        return self.verdicts[token]
+
+
+def get_file_hash(file_path: str, chunk_size: int = 1048576) -> str:
+    """Gets the BLAKE2b hash of a file, read in chunks."""
+
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as hash_file:
+        for chunk in iter(lambda: hash_file.read(chunk_size), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
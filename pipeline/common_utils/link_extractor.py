@@ -0,0 +1,98 @@
+import re
+import codecs
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple, Union
+
+#!/usr/bin/env python
+#
+# link_extractor.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+# Charset declared by a <meta charset> or <meta http-equiv="Content-Type"> tag.
+_META_CHARSET = re.compile(rb"<\s*meta[^>]+charset\s*=\s*[\"']?\s*([a-zA-Z0-9_:.+-]+)", re.IGNORECASE)
+
+
+class LinkExtractor(HTMLParser):
+    """
+    Streaming extractor of the href of the <a> tags of a web page.
+
+    The markup is tokenized by html.parser without building a document tree: only the start
+    tags are handled, and the href of each <a> tag is collected (None when it has none). The
+    tag and attribute names are lower-cased and the attribute values unescaped, as in the
+    BeautifulSoup tree built with the same parser, so the links are the same.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.hrefs: List[Optional[str]] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "a":
+            href = None
+            for name, value in attrs:
+                if name == "href":
+                    href = value
+            self.hrefs.append(href)
+
+    def extract_hrefs(self, content: Union[bytes, str]) -> List[Optional[str]]:
+        """
+        Extracts the href of the <a> tags of a web page.
+
+        :param content: the body of the web page.
+        :return: a list of hrefs, None for the <a> tags without href.
+        """
+
+        self.reset()
+        self.hrefs = []
+        self.feed(decode_html(content) if isinstance(content, bytes) else content)
+        self.close()
+
+        return self.hrefs
+
+
+def decode_html(content: bytes) -> str:
+    """
+    Decodes the body of a web page with the encoding of its BOM or declared in its <meta>
+    tags, or else as UTF-8, falling back on windows-1252.
+    """
+
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be")):
+        if content.startswith(bom):
+            return content[len(bom):].decode(encoding, errors="replace")
+
+    declared = _META_CHARSET.search(content, 0, max(2048, len(content) // 20))
+    if declared:
+        try:
+            return content.decode(declared.group(1).decode("ascii"))
+        except (LookupError, UnicodeDecodeError):
+            pass
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("windows-1252", errors="replace")
+
+
+def count_links(hrefs: List[Optional[str]], domain: str) -> Tuple[int, int]:
+    """
+    Counts the outlinks (absolute links to other domains) and the inlinks (the other links,
+    without the fragments of the page itself).
+
+    :param hrefs: the hrefs of the links of a web page.
+    :param domain: the domain of the web page.
+    :return: the number of outlinks and of inlinks.
+    """
+
+    outlink_count = 0
+    inlink_count = 0
+    for href in hrefs:
+        if href and (href.startswith('http://') or href.startswith('https://')):
+            if domain not in href:
+                outlink_count += 1
+            else:
+                inlink_count += 1
+        elif href and not href.startswith('#'):
+            inlink_count += 1
+
+    return outlink_count, inlink_count
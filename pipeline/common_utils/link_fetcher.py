@@ -0,0 +1,149 @@
+import time
+import logging
+import threading
+import requests
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from common_utils.url_filter import get_host
+
+#!/usr/bin/env python
+#
+# link_fetcher.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+class LinkFetcher:
+    """
+    Concurrent fetcher of web pages over a pooled requests.Session.
+
+    A thread pool of max_workers fetches the pages, with at most max_per_host requests in
+    flight per host. Each request has explicit connect and read timeouts, and its body is
+    streamed and truncated to max_body_bytes, within total_timeout seconds, so a slow or huge
+    page cannot stall the fetcher. Pages are returned in the order of the urls, with up to
+    max_pending urls (16 per worker by default) read ahead of the first page not yet returned.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        max_per_host: int = 2,
+        connect_timeout: float = 5,
+        read_timeout: float = 15,
+        total_timeout: float = 30,
+        max_body_bytes: int = 5242880,
+        chunk_size: int = 65536,
+        max_pending: int = None
+    ) -> None:
+        self.max_workers = max(max_workers, 1)
+        self.max_per_host = max(max_per_host, 1)
+        self.timeout = (connect_timeout, read_timeout)
+        self.total_timeout = total_timeout
+        self.max_body_bytes = max_body_bytes
+        self.chunk_size = chunk_size
+        self.max_pending = max(max_pending or 16 * self.max_workers, 1)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"fetched": 0, "failed": 0, "not_ok": 0, "truncated": 0}
+        self.stats_lock = threading.Lock()
+
+    def __enter__(self) -> "LinkFetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def count(self, stat: str) -> None:
+        with self.stats_lock:
+            self.stats[stat] += 1
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        """
+        Fetches a page, regardless of the requests in flight to its host (see fetch_many).
+
+        :param url: the page url.
+        :return: the (possibly truncated) body of the page, or None if the request failed
+            or the status code is not 200.
+        """
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    self.count("not_ok")
+                    return None
+                body = bytearray()
+                deadline = time.monotonic() + self.total_timeout
+                for chunk in response.iter_content(self.chunk_size):
+                    body += chunk
+                    if len(body) >= self.max_body_bytes or time.monotonic() > deadline:
+                        self.count("truncated")
+                        break
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.debug(f"Failed to fetch {url}: {e}")
+            self.count("failed")
+            return None
+
+        self.count("fetched")
+        return bytes(body[:self.max_body_bytes])
+
+    def fetch_many(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """
+        Fetches the pages concurrently, scheduled per host: the urls read ahead wait in the
+        queue of their host, and a url is only handed to the thread pool once its host has
+        less than max_per_host requests in flight, the oldest queued url first. So the workers
+        keep fetching the pages of the other hosts while a host is saturated or slow, even
+        when the urls come grouped by host. The fetched pages wait in a reorder buffer until
+        the pages before them are returned.
+
+        :param urls: the page urls.
+        :return: an iterator of (url, body or None), in the order of the urls.
+        """
+        urls = iter(urls)
+        host_queues: Dict[str, deque] = {}  # (index, url) waiting for a free slot of their host
+        host_requests = Counter()  # requests in flight per host
+        futures = {}
+        fetched_pages = {}  # reorder buffer of the pages fetched ahead, by url index
+        next_index, next_page, exhausted = 0, 0, False
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                while not exhausted and next_index - next_page < self.max_pending:
+                    url = next(urls, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    host_queues.setdefault(get_host(url) or "", deque()).append((next_index, url))
+                    next_index += 1
+
+                while len(futures) < self.max_workers:
+                    ready_hosts = [
+                        (queue[0][0], host) for host, queue in host_queues.items()
+                        if host_requests[host] < self.max_per_host
+                    ]
+                    if not ready_hosts:
+                        break
+                    _, host = min(ready_hosts)
+                    index, url = host_queues[host].popleft()
+                    if not host_queues[host]:
+                        del host_queues[host]
+                    host_requests[host] += 1
+                    futures[executor.submit(self.fetch, url)] = (index, url, host)
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, url, host = futures.pop(future)
+                    host_requests[host] -= 1
+                    if not host_requests[host]:
+                        del host_requests[host]
+                    fetched_pages[index] = (url, future.result())
+                while next_page in fetched_pages:
+                    yield fetched_pages.pop(next_page)
+                    next_page += 1
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+#!/usr/bin/env python
+#
+# metrics.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+# File extension of each report format.
+REPORT_EXTENSIONS = {"json": "json", "prometheus": "prom"}
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Metrics:
+    """
+    Thread-safe metrics of a pipeline stage: counters and gauges (with optional labels, e.g.
+    the rejection reason) and timers accumulating the seconds and calls of the hot paths.
+    The report is saved as JSON, or as a Prometheus textfile (.prom) for the node exporter.
+    """
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.counters: Dict[MetricKey, float] = Counter()
+        self.gauges: Dict[MetricKey, float] = {}
+        self.timers: Dict[str, list] = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["lock"]  # Picklable for the worker processes
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Adds value to a counter."""
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Sets a gauge."""
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Adds seconds and calls to a timer."""
+        with self.lock:
+            timer = self.timers.setdefault(name, [0.0, 0])
+            timer[0] += seconds
+            timer[1] += calls
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Times the enclosed block into a timer."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def merge(self, report: dict) -> None:
+        """Adds the counters and timers of a report of the same stage, e.g. from a worker process."""
+        for counter in report.get("counters", []):
+            self.increment(counter["name"], counter["value"], **counter["labels"])
+        for gauge in report.get("gauges", []):
+            self.set(gauge["name"], gauge["value"], **gauge["labels"])
+        for name, timer in report.get("timers", {}).items():
+            self.add_time(name, timer["seconds"], timer["calls"])
+
+    def to_dict(self) -> dict:
+        """Gets the report of the metrics."""
+        with self.lock:
+            return {
+                "stage": self.stage,
+                "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.gauges.items())
+                ],
+                "timers": {
+                    name: {"seconds": round(seconds, 6), "calls": calls}
+                    for name, (seconds, calls) in sorted(self.timers.items())
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "labadain") -> str:
+        """Gets the report of the metrics in the Prometheus text format."""
+
+        def sample(name: str, labels: dict, value: float) -> str:
+            labels = dict(labels, stage=self.stage)
+            label_text = ",".join(
+                f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                for key, value in sorted(labels.items())
+            )
+            return f"{prefix}_{name}{{{label_text}}} {value}"
+
+        report = self.to_dict()
+        lines = []
+        for kind, suffix, metric_type in (("counters", "_total", "counter"), ("gauges", "", "gauge")):
+            declared = set()
+            for metric in report[kind]:
+                name = metric["name"] + suffix
+                if name not in declared:
+                    lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+                    declared.add(name)
+                lines.append(sample(name, metric["labels"], metric["value"]))
+        if report["timers"]:
+            lines.append(f"# TYPE {prefix}_timer_seconds_total counter")
+            lines.extend(
+                sample("timer_seconds_total", {"timer": name}, timer["seconds"])
+                for name, timer in report["timers"].items())
+            lines.append(f"# TYPE {prefix}_timer_calls_total counter")
+            lines.extend(
+                sample("timer_calls_total", {"timer": name}, timer["calls"])
+                for name, timer in report["timers"].items())
+
+        return "\n".join(lines) + "\n"
+
+    def save(self, report_file_path: Optional[str]) -> None:
+        """
+        Saves the report through a temporary file: a Prometheus textfile for a .prom file,
+        JSON otherwise. Nothing is saved without a file path.
+        """
+
+        if not report_file_path:
+            return
+        os.makedirs(os.path.dirname(report_file_path) or ".", exist_ok=True)
+        with open(f"{report_file_path}.tmp", "w", encoding="utf-8") as report_file:
+            if report_file_path.endswith(".prom"):
+                report_file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), report_file, indent=2)
+        os.replace(f"{report_file_path}.tmp", report_file_path)
+        logging.info(f"Metrics report saved -> {report_file_path}")
+
+
+class SampledLog:
+    """
+    Per-document log at the DEBUG level, sampled to 1 in every messages of each kind (none
+    with every = 0), so the per-document messages cost nothing when DEBUG is off and stay
+    small when it is on. The messages are formatted lazily, as in logging.
+    """
+
+    def __init__(self, every: int = 1000, logger: logging.Logger = None) -> None:
+        self.every = every
+        self.logger = logger or logging.getLogger()
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def debug(self, kind: str, message: str, *args) -> None:
+        if not self.every or not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        with self.lock:
+            count = self.counts[kind]
+            self.counts[kind] += 1
+        if count % self.every == 0:
+            self.logger.debug(f"[{kind} {count + 1}] {message}", *args)
+
+
+@contextmanager
+def profile_stage(profile_file_path: Optional[str]) -> Iterator[None]:
+    """
+    Profiles the enclosed block with cProfile and dumps the statistics to the file (to read with
+    pstats or snakeviz); only the calling thread is profiled. Does nothing without a file path.
+    """
+
+    if not profile_file_path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(profile_file_path) or ".", exist_ok=True)
+        profiler.dump_stats(profile_file_path)
+        logging.info(f"Profile saved -> {profile_file_path}")
+
+
+def get_report_file_path(metrics_path: str, stage: str, metrics_format: Optional[str]) -> Optional[str]:
+    """
+    Gets the path of the metrics report of a stage.
+
+    :param metrics_path: the folder of the reports.
+    :param stage: the stage name.
+    :param metrics_format: "json", "prometheus", or None for no report.
+    :return: the report file path, or None.
+    """
+
+    if not metrics_format:
+        return None
+    if metrics_format not in REPORT_EXTENSIONS:
+        raise ValueError(f"Unknown metrics format: {metrics_format}, expected one of {list(REPORT_EXTENSIONS)}")
+
+    return os.path.join(metrics_path, f"{stage}_metrics.{REPORT_EXTENSIONS[metrics_format]}")
+
+
+def get_profile_file_path(metrics_path: str, stage: str, profile: bool) -> Optional[str]:
+    """Gets the path of the cProfile statistics of a stage, or None when it is not profiled."""
+
+    return os.path.join(metrics_path, f"{stage}.prof") if profile else None
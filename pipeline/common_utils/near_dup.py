@@ -0,0 +1,158 @@
+import zlib
+import numpy as np
+from typing import Tuple
+
+#!/usr/bin/env python
+#
+# near_dup.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+# Largest prime below 2**32, modulus of the MinHash permutations.
+_PRIME = 4294967291
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate detection with MinHash signatures and an LSH band index.
+
+    Each document is reduced to the set of its word shingles and to a signature of
+    num_perm uint32 MinHash values. The signature is split into bands; two documents
+    sharing a band are candidates (each band bucket keeps the slots of all its signatures,
+    from the oldest to the newest), and a candidate is a near duplicate when the estimated
+    Jaccard similarity of the signatures is >= threshold. At most max_documents signatures
+    are indexed: past that, the oldest ones are evicted, so the memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        shingle_size: int = 5,
+        num_perm: int = 64,
+        threshold: float = 0.8,
+        max_documents: int = 1000000,
+        seed: int = 1
+    ) -> None:
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.max_documents = max_documents
+        self.bands, self.rows = get_lsh_params(num_perm, threshold)
+
+        rng = np.random.default_rng(seed)
+        self.perm_a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self.band_coefficients = rng.integers(1, 2 ** 63, size=self.rows, dtype=np.uint64)
+        self.clear()
+
+    def clear(self) -> None:
+        """Removes all the signatures from the index."""
+
+        self.total_documents = 0
+        self.signatures = np.zeros((0, self.num_perm), dtype=np.uint32)
+        self.band_keys = np.zeros((0, self.bands), dtype=np.uint64)
+        self.band_tables = [{} for _ in range(self.bands)]
+
+    def get_signature(self, text: str) -> np.ndarray:
+        """
+        Gets the MinHash signature of the word shingles of a text.
+
+        :param text: the document text.
+        :return: an array of num_perm uint32 values.
+        """
+
+        words = text.split()
+        shingles = {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(max(len(words) - self.shingle_size + 1, 1))
+        }
+        shingle_hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        permuted_hashes = (np.outer(self.perm_a, shingle_hashes) + self.perm_b[:, None]) % _PRIME
+
+        return permuted_hashes.min(axis=1).astype(np.uint32)
+
+    def get_band_keys(self, signature: np.ndarray) -> np.ndarray:
+        """Gets the hash of each band of a signature."""
+
+        bands = signature.astype(np.uint64).reshape(self.bands, self.rows)
+
+        return (bands * self.band_coefficients).sum(axis=1, dtype=np.uint64)
+
+    def is_near_duplicate(self, signature: np.ndarray) -> bool:
+        """Checks if a signature is a near duplicate of an indexed one."""
+
+        checked_slots = set()
+        for band, key in enumerate(self.get_band_keys(signature).tolist()):
+            for slot in self.band_tables[band].get(key, ()):
+                if slot in checked_slots:
+                    continue
+                if np.mean(self.signatures[slot] == signature) >= self.threshold:
+                    return True
+                checked_slots.add(slot)
+
+        return False
+
+    def add(self, signature: np.ndarray) -> None:
+        """Adds a signature to the index, evicting the oldest one once the index is full."""
+
+        slot = self.total_documents % self.max_documents
+        if self.total_documents >= self.max_documents:
+            for band, key in enumerate(self.band_keys[slot].tolist()):
+                slots = self.band_tables[band][key]
+                slots.remove(slot)
+                if not slots:
+                    del self.band_tables[band][key]
+        elif slot >= len(self.signatures):
+            capacity = min(max(2 * len(self.signatures), 1024), self.max_documents)
+            self.signatures = np.resize(self.signatures, (capacity, self.num_perm))
+            self.band_keys = np.resize(self.band_keys, (capacity, self.bands))
+
+        band_keys = self.get_band_keys(signature)
+        self.signatures[slot] = signature
+        self.band_keys[slot] = band_keys
+        for band, key in enumerate(band_keys.tolist()):
+            self.band_tables[band].setdefault(key, []).append(slot)
+        self.total_documents += 1
+
+    def save(self, state_file_path: str) -> None:
+        """Saves the indexed signatures, from the oldest to the newest, to a .npy file."""
+
+        total_indexed = min(self.total_documents, self.max_documents)
+        first_slot = self.total_documents % self.max_documents if total_indexed == self.max_documents else 0
+        slots = (np.arange(total_indexed) + first_slot) % self.max_documents
+        with open(state_file_path, "wb") as state_file:
+            np.save(state_file, self.signatures[slots])
+
+    def load(self, state_file_path: str) -> None:
+        """Rebuilds the index from the signatures saved by save."""
+
+        self.clear()
+        for signature in np.load(state_file_path):
+            self.add(signature)
+
+    def check_and_add(self, signature: np.ndarray) -> bool:
+        """
+        Checks if a signature is a near duplicate and, if it is not, adds it to the index.
+
+        :return: True if the signature is a near duplicate of an indexed one.
+        """
+
+        if self.is_near_duplicate(signature):
+            return True
+        self.add(signature)
+
+        return False
+
+
+def get_lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Gets the number of bands and of rows per band, with bands * rows == num_perm, whose
+    LSH similarity threshold (1 / bands) ** (1 / rows) is the closest to the given one.
+    """
+
+    candidates = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+
+    return min(candidates, key=lambda params: abs((1 / params[0]) ** (1 / params[1]) - threshold))
@@ -0,0 +1,91 @@
+import os
+from typing import Iterator, List, Tuple
+
+#!/usr/bin/env python
+#
+# nutch_dump.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+"""
+Streaming readers of the plain text dumps of the Nutch crawl data:
+
+* nutch readlinkdb <crawl>/linkdb -dump <out>, with one record per url:
+      <url>\tInlinks:
+       fromUrl: <url> anchor: <text>
+* nutch readseg -dump <crawl>/segments/<segment> <out> -nocontent -nofetch -nogenerate -noparse -noparsetext,
+  with the parse data of each url:
+      URL:: <url>
+      ParseData::
+      Outlinks: <n>
+        outlink: toUrl: <url> anchor: <text>
+"""
+
+
+def get_dump_files(dump_path: str) -> List[str]:
+    """
+    Gets the dump files under a path: the file itself, or the part files of a dump folder
+    (and of its sub-folders, e.g. one per segment), without the checksum and hidden files.
+    """
+
+    if not dump_path or not os.path.exists(dump_path):
+        raise FileNotFoundError(f"The Nutch dump not found at: {dump_path}")
+    if os.path.isfile(dump_path):
+        return [dump_path]
+
+    dump_files = []
+    for folder, sub_folders, files in os.walk(dump_path):
+        sub_folders.sort()
+        for file in sorted(files):
+            if not file.startswith((".", "_")) and not file.endswith(".crc"):
+                dump_files.append(os.path.join(folder, file))
+
+    return dump_files
+
+
+def iter_linkdb_inlinks(dump_path: str) -> Iterator[Tuple[str, int]]:
+    """
+    Reads the inlinks of each url from a linkdb dump, in a single streaming pass.
+
+    :param dump_path: the dump file or folder.
+    :return: an iterator of (url, number of inlinks).
+    """
+
+    for dump_file in get_dump_files(dump_path):
+        url, inlinks = None, 0
+        with open(dump_file, "r", encoding="utf-8", errors="replace") as dump:
+            for line in dump:
+                if line.startswith(" fromUrl: "):
+                    inlinks += 1
+                elif "\tInlinks:" in line:
+                    if url is not None:
+                        yield url, inlinks
+                    url, inlinks = line.split("\t", 1)[0].strip(), 0
+        if url is not None:
+            yield url, inlinks
+
+
+def iter_segment_outlinks(dump_path: str) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Reads the outlinks of each parsed url from segment dumps, in a single streaming pass.
+    The urls without parse data (e.g. not fetched) are skipped.
+
+    :param dump_path: the dump file or folder (e.g. with one sub-folder per segment).
+    :return: an iterator of (url, outlink urls).
+    """
+
+    for dump_file in get_dump_files(dump_path):
+        url, outlinks, is_parsed = None, [], False
+        with open(dump_file, "r", encoding="utf-8", errors="replace") as dump:
+            for line in dump:
+                if line.startswith("URL:: "):
+                    if is_parsed:
+                        yield url, outlinks
+                    url, outlinks, is_parsed = line[len("URL:: "):].strip(), [], False
+                elif line.startswith("ParseData::"):
+                    is_parsed = True
+                elif is_parsed and line.lstrip().startswith("outlink: toUrl: "):
+                    outlinks.append(line.lstrip()[len("outlink: toUrl: "):].split(" anchor: ", 1)[0].strip())
+        if is_parsed:
+            yield url, outlinks
@@ -0,0 +1,121 @@
+import queue
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Iterator
+
+#!/usr/bin/env python
+#
+# prefetch.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+# Marks the end of the items (or the error) sent by the producer thread.
+_END = object()
+
+
+class Prefetcher:
+    """
+    Runs an iterable in a background thread that keeps up to max_size upcoming items in a
+    bounded queue, so the producer works while the consumer handles the current item.
+
+    The bounded queue applies backpressure to the producer, an error raised by the producer
+    is re-raised to the consumer, and closing the prefetcher (e.g. when the consumer fails)
+    stops the producer. The producer sees the stop between two items, so closing waits for
+    it at most join_timeout seconds: a producer stuck in a slow item is left behind as a
+    daemon thread rather than blocking the consumer. Prefetchers can be chained to build a multi-stage pipeline; the queue
+    metrics of each stage show which one is the bottleneck.
+    """
+
+    def __init__(
+        self, iterable: Iterable, max_size: int, name: str = "prefetch", join_timeout: float = 10.0
+    ) -> None:
+        self.iterable = iterable
+        self.name = name
+        self.join_timeout = join_timeout
+        self.queue = queue.Queue(maxsize=max_size)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._produce, name=name, daemon=True)
+        self.items = 0
+        self.total_depth = 0
+        self.max_depth = 0
+        self.consumer_wait = 0.0
+        self.producer_wait = 0.0
+
+    def __enter__(self) -> "Prefetcher":
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _put(self, item: object) -> bool:
+        """Puts an item in the queue, waiting for room unless the prefetcher is closed."""
+        start = time.perf_counter()
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                self.producer_wait += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for item in self.iterable:
+                if not self._put((item, None)):
+                    return
+            self._put((_END, None))
+        except BaseException as error:
+            self._put((_END, error))
+
+    def __iter__(self) -> Iterator:
+        while True:
+            depth = self.queue.qsize()
+            self.total_depth += depth
+            self.max_depth = max(self.max_depth, depth)
+            start = time.perf_counter()
+            while True:
+                if self.stop_event.is_set():
+                    return
+                try:
+                    item, error = self.queue.get(timeout=0.1)
+                    break
+                except queue.Empty:
+                    continue
+            self.consumer_wait += time.perf_counter() - start
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            self.items += 1
+            yield item
+
+    def close(self) -> None:
+        """Stops the producer thread and waits for it to finish, at most join_timeout seconds."""
+        self.stop_event.set()
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        if self.thread.is_alive():
+            self.thread.join(self.join_timeout)
+            if self.thread.is_alive():
+                logging.warning(f"The '{self.name}' stage did not stop within {self.join_timeout} seconds.")
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Gets the queue metrics of the stage: a consumer that often waits on an empty queue
+        points at a slow producer, a producer that often waits on a full queue points at a
+        slow consumer.
+        """
+        return {
+            "items": self.items,
+            "max_queue_depth": self.max_depth,
+            "mean_queue_depth": round(self.total_depth / max(self.items, 1), 2),
+            "consumer_wait_seconds": round(self.consumer_wait, 3),
+            "producer_wait_seconds": round(self.producer_wait, 3),
+        }
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from googlesearch import search
+
+#!/usr/bin/env python
+#
+# search_backend.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+class SearchBackend(ABC):
+    """Interface of the search providers returning the seed urls of a query."""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, query: str, num_results: int) -> List[str]:
+        """
+        Searches a query.
+
+        :param query: the search query (seed words).
+        :param num_results: the maximum number of results.
+        :return: a list of result urls.
+        """
+
+
+class GoogleSearchBackend(SearchBackend):
+    """Google search, through the googlesearch package."""
+
+    name = "google"
+
+    def __init__(self, timeout: float = 5) -> None:
+        self.timeout = timeout
+
+    def search(self, query: str, num_results: int) -> List[str]:
+        return list(search(query, num_results=num_results, timeout=self.timeout))
+
+
+class FixtureSearchBackend(SearchBackend):
+    """
+    Offline search backend answering from a canned JSON file mapping each query to its urls.
+    The urls under the "*" key answer the queries missing from the file. An optional delay
+    per query simulates the latency of a real provider.
+    """
+
+    name = "fixture"
+
+    def __init__(self, fixture_file_path: str, delay: float = 0.0) -> None:
+        self.fixture_file_path = fixture_file_path
+        self.delay = delay
+        with open(fixture_file_path, "r", encoding="utf-8") as fixture_file:
+            self.results: Dict[str, List[str]] = json.load(fixture_file)
+
+    def search(self, query: str, num_results: int) -> List[str]:
+        if self.delay:
+            time.sleep(self.delay)
+        return self.results.get(query, self.results.get("*", []))[:num_results]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter: tokens are refilled at rate per second, up to
+    capacity, and each call takes one token, waiting for it if the bucket is empty.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Takes a token, waiting until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SearchFanOut:
+    """
+    Runs many search queries at once against a backend, with at most max_concurrency queries
+    in flight and at most rate queries started per second (in bursts of up to burst queries).
+    A failed query is reported and returns no results, without stopping the others.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        max_concurrency: int = 1,
+        rate: Optional[float] = None,
+        burst: int = 1
+    ) -> None:
+        self.backend = backend
+        self.max_concurrency = max(max_concurrency, 1)
+        self.rate_limiter = TokenBucket(rate, burst) if rate else None
+
+    def search_one(self, query: str, num_results: int) -> List[str]:
+        """Searches a query once the rate limiter allows it."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        try:
+            return self.backend.search(query, num_results)
+        except Exception as e:
+            print(f"Error while searching [{query}] with the {self.backend.name} backend: {e}")
+            return []
+
+    def search_many(self, queries: List[str], num_results: int) -> List[List[str]]:
+        """
+        Searches the queries concurrently.
+
+        :param queries: the search queries.
+        :param num_results: the maximum number of results per query.
+        :return: the list of result urls of each query, in the order of the queries.
+        """
+        if len(queries) <= 1 or self.max_concurrency == 1:
+            return [self.search_one(query, num_results) for query in queries]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(queries))) as executor:
+            return list(executor.map(lambda query: self.search_one(query, num_results), queries))
+
+
+def get_search_backend(backend_name: str, fixture_file_path: str = None) -> SearchBackend:
+    """
+    Gets the search backend by its name ("google" or "fixture").
+
+    :param backend_name: the name of the search backend.
+    :param fixture_file_path: the JSON file of the fixture backend.
+    :return: the search backend.
+    """
+    if backend_name == GoogleSearchBackend.name:
+        return GoogleSearchBackend()
+    if backend_name == FixtureSearchBackend.name:
+        if not fixture_file_path or not os.path.exists(fixture_file_path):
+            raise FileNotFoundError(f"The search fixture file not found at: {fixture_file_path}")
+        return FixtureSearchBackend(fixture_file_path)
+    raise ValueError(f"Unknown search backend: {backend_name}")
@@ -1,6 +1,7 @@
 import os
 import joblib
-from typing import List
+import numpy as np
+from typing import Dict, List, Tuple
 from pathlib import Path
 
 #!/usr/bin/env python
@@ -10,43 +11,84 @@ from pathlib import Path
 # Updated on 27-02-2025
 
 
+# LID models loaded by this process, keyed by (absolute model path, mmap mode).
+_LID_MODEL_CACHE: Dict[Tuple[str, str], object] = {}
+
+
 class TetunLid:
     """
-    Tetun LID class loads the LID model file, applies it to the input text, 
-    and then filters out texts that do not meet the predefined threshold.
+    Tetun LID class loads the LID model file, applies it to the input texts in batches,
+    and then flags the texts that meet the predefined threshold.
     """
 
     def __init__(
-        self, tetun_lang: str, lang_proba_threshold: float, lid_model_file_path: str,
+        self,
+        tetun_lang: str,
+        lang_proba_threshold: float,
+        lid_model_file_path: str,
+        mmap_mode: str = None,
     ) -> None:
         self.tetun_lang = tetun_lang
         self.lang_proba_threshold = lang_proba_threshold
         self.lid_model_file_path = lid_model_file_path
+        self.mmap_mode = mmap_mode
 
     def load_lid_model(self) -> object:
-        """Loads  and return the language identification (LID) model."""
+        """
+        Loads and return the language identification (LID) model.
 
-        if not os.path.exists(self.lid_model_file_path):
-            print(f"The LID model file not found at: {self.lid_model_file_path}")
-            return []
-        model = joblib.load(Path(self.lid_model_file_path))
+        The model is unpickled once per process and shared by every TetunLid instance
+        pointing at the same file. With mmap_mode (e.g. "r"), large numpy arrays stored
+        in the pickle are memory-mapped instead of being copied into memory.
+        """
 
-        return model
+        model_path = os.path.abspath(self.lid_model_file_path)
+        cache_key = (model_path, self.mmap_mode)
+        if cache_key not in _LID_MODEL_CACHE:
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(
+                    f"The LID model file not found at: {self.lid_model_file_path}")
+            _LID_MODEL_CACHE[cache_key] = joblib.load(
+                Path(model_path), mmap_mode=self.mmap_mode)
 
-    def get_tetun_text(self, input_text: List[str]) -> List[str]:
+        return _LID_MODEL_CACHE[cache_key]
+
+    def get_tetun_proba(self, input_text: List[str], batch_size: int = None) -> np.ndarray:
         """
-        Gets Tetun words with a probability >= threshold. 
+        Gets the Tetun probability of the texts.
 
         :param input_text: a list of string.
-        :return: a list of texts.
+        :param batch_size: maximum number of texts per predict_proba call (None for a single call).
+        :return: a float array aligned with input_text.
         """
 
-        tetun_text = []
+        if len(input_text) == 0:
+            return np.zeros(0)
+
         tetun_lid_model = self.load_lid_model()
-        pred_probs = tetun_lid_model.predict_proba(input_text)
-        for i, probs in enumerate(pred_probs):
-            for j, lang in enumerate(tetun_lid_model.classes_):
-                if lang == self.tetun_lang and round(probs[j], 2) >= self.lang_proba_threshold:
-                    tetun_text.append(input_text[i])
+        classes = list(tetun_lid_model.classes_)
+        if self.tetun_lang not in classes:
+            return np.zeros(len(input_text))
+
+        tetun_index = classes.index(self.tetun_lang)
+        batch_size = batch_size or len(input_text)
+
+        return np.concatenate([
+            tetun_lid_model.predict_proba(input_text[i:i + batch_size])[:, tetun_index]
+            for i in range(0, len(input_text), batch_size)
+        ])
+
+    def is_tetun(self, tetun_probs: np.ndarray) -> np.ndarray:
+        """Flags the Tetun probabilities >= threshold."""
+        return np.round(tetun_probs, 2) >= self.lang_proba_threshold
+
+    def get_tetun_mask(self, input_text: List[str], batch_size: int = None) -> np.ndarray:
+        """
+        Gets a boolean mask flagging the texts with a Tetun probability >= threshold.
+
+        :param input_text: a list of string.
+        :param batch_size: maximum number of texts per predict_proba call (None for a single call).
+        :return: a boolean array aligned with input_text.
+        """
 
-        return tetun_text
+        return self.is_tetun(self.get_tetun_proba(input_text, batch_size))
@@ -0,0 +1,85 @@
+import re
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+#!/usr/bin/env python
+#
+# url_filter.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+# Marks the end of an excluded domain in the suffix trie.
+_END = ""
+
+
+class UrlFilter:
+    """
+    Admission filter of the seed urls, compiled once from the exclusion rules.
+
+    The extension patterns are combined into a single regular expression, matched against
+    the lower-cased url. The excluded domains are kept in a trie of their reversed labels
+    (e.g. com -> facebook), so a url is excluded when its host is an excluded domain or one
+    of its subdomains, at a cost that depends on the number of labels of the host only.
+    """
+
+    def __init__(self, extensions_to_exclude: List[str], domains_to_exclude: List[str]) -> None:
+        self.extension_pattern = re.compile(
+            "|".join(f"(?:{extension})" for extension in extensions_to_exclude)
+        ) if extensions_to_exclude else None
+        self.domain_trie = {}
+        for domain in domains_to_exclude:
+            self.add_domain(domain)
+
+    def add_domain(self, domain: str) -> None:
+        """Adds an excluded domain to the suffix trie."""
+
+        node = self.domain_trie
+        for label in reversed(domain.strip().strip(".").lower().split(".")):
+            node = node.setdefault(label, {})
+        node[_END] = True
+
+    def is_excluded_extension(self, url: str) -> bool:
+        """Checks if the url matches one of the excluded extension patterns."""
+
+        return self.extension_pattern is not None and self.extension_pattern.search(url.lower()) is not None
+
+    def is_excluded_domain(self, url: str) -> bool:
+        """Checks if the host of the url is an excluded domain or one of its subdomains."""
+
+        host = get_host(url)
+        if not host:
+            return False
+        node = self.domain_trie
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+
+        return False
+
+    def is_allowed(self, url: str) -> bool:
+        """
+        Checks if the url is neither an excluded file type nor on an excluded domain.
+
+        :param url: a seed url.
+        :return: True if the url is allowed, False otherwise.
+        """
+
+        return not self.is_excluded_extension(url) and not self.is_excluded_domain(url)
+
+
+def get_host(url: str) -> Optional[str]:
+    """Gets the lower-cased host name of a url, with or without a scheme."""
+
+    try:
+        parts = urlsplit(url.strip())
+        if not parts.netloc:
+            parts = urlsplit("//" + url.strip())
+        host = parts.hostname
+    except ValueError:
+        return None
+
+    return host.rstrip(".") if host else None
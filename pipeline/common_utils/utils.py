@@ -1,8 +1,12 @@
 import os
 import re
-import html
 import tldextract
-from typing import List
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import urlsplit
+from common_utils.corpus_index import (
+    build_corpus_index, encode_entries, index_texts, is_valid_corpus_index, pop_corpus_index_tail
+)
 
 #!/usr/bin/env python
 #
@@ -11,6 +15,17 @@ from typing import List
 # Updated on 27-02-2025
 
 
+# Domain extractor working offline: it only uses the public suffix list snapshot bundled
+# with tldextract, never fetched nor cached on disk.
+_TLD_EXTRACTOR = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+# Maximum number of hosts kept in the domain extraction cache.
+DOMAIN_CACHE_SIZE = 100000
+
+# HTML tag, within a line.
+HTML_TAG_PATTERN = re.compile('<.*?>')
+
+
 class Utils:
     """This class contains functions to load and write a text corpus from/to a file."""
 
@@ -34,37 +49,169 @@ class Utils:
 
         return contents
 
-    def load_final_corpus(self):
-        """Load and read the final corpus."""
+    def save_corpus(self, text_line: str = None, is_not_eol: bool = True):
+        """ Save the text corpus (append), if it is an EOL then add a new line. """
+        with open(self.file_path, "a", encoding="utf-8") as write_file:
+            if is_not_eol:
+                write_file.write(text_line + "\n")
+            else:
+                write_file.write("\n")
+
+
+class CorpusWriter:
+    """
+    Long-lived buffered writer for the corpus files, used as a context manager.
+
+    Lines are kept in memory and written out in batches of about buffer_size bytes,
+    only at document boundaries (end_document), so a crash never leaves a half-written
+    document at the end of the file. In append mode the committed documents are appended
+    to the file in place; otherwise they are written to a temporary file that atomically
+    replaces the target file once the writer is closed without errors. The offset attribute
+    is the size of the file once the buffer is flushed.
+
+    With an index_file_path, the offset and length of each text separated by a blank line are
+    also written to an offset index (see corpus_index), in step with the documents, so that
+    it is the same as the index built from the file: a document without a trailing blank
+    line (e.g. without content lines) is indexed together with the next one. The index of
+    an existing file that it does not cover is rebuilt first.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        buffer_size: int = 1048576,
+        append: bool = True,
+        index_file_path: str = None
+    ) -> None:
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self.append = append
+        self.tmp_file_path = file_path if append else f"{file_path}.tmp"
+        self.index_file_path = index_file_path
+        self.tmp_index_file_path = index_file_path if append or index_file_path is None else f"{index_file_path}.tmp"
+        self.write_file = None
+        self.index_file = None
+        self.offset = 0
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.index_entries = []
+        self.index_start = 0
+        self.index_pending = b""
+        self.document = []
+
+    def __enter__(self) -> "CorpusWriter":
+        self.write_file = open(self.tmp_file_path, "ab" if self.append else "wb", buffering=0)
+        self.offset = self.write_file.seek(0, os.SEEK_END)
+        if self.index_file_path:
+            if self.append and not is_valid_corpus_index(self.file_path, self.index_file_path):
+                build_corpus_index(self.file_path, self.index_file_path)
+            if self.append:
+                self.index_start, self.index_pending = pop_corpus_index_tail(self.file_path, self.index_file_path)
+            self.index_file = open(self.tmp_index_file_path, "ab" if self.append else "wb", buffering=0)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(commit=exc_type is None)
+
+    def save_corpus(self, text_line: str = None, is_not_eol: bool = True) -> None:
+        """ Save the text corpus (buffered), if it is an EOL then add a new line. """
+        if is_not_eol:
+            self.document.append(text_line + "\n")
+        else:
+            self.document.append("\n")
+
+    def end_document(self) -> None:
+        """Mark the end of the current document, flushing the buffer once it is full."""
+        if self.document:
+            document = "".join(self.document).encode("utf-8")
+            if self.index_file is not None:
+                entries, self.index_start, self.index_pending = index_texts(
+                    self.index_start, self.index_pending + document)
+                self.index_entries.extend(entries)
+            self.buffer.append(document)
+            self.buffer_bytes += len(document)
+            self.document = []
+        if self.buffer_bytes >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the complete documents held in the buffer to the file."""
+        if self.buffer:
+            self.write_file.write(b"".join(self.buffer))
+            self.offset += self.buffer_bytes
+            self.buffer = []
+            self.buffer_bytes = 0
+        if self.index_entries:
+            self.index_file.write(encode_entries(self.index_entries))
+            self.index_entries = []
+
+    def close(self, commit: bool = True) -> None:
+        """
+        Close the writer. On commit, the pending document is completed and, outside the
+        append mode, the target file is replaced. Otherwise the pending document is dropped
+        and, outside the append mode, the target file is left untouched.
+        """
+        if self.write_file is None:
+            return
         try:
-            with open(self.file_path, "r", encoding="utf-8") as load_file:
-                contents = load_file.read()
+            if commit:
+                self.end_document()
+            if self.index_file is not None and self.index_pending.strip(b"\n"):
+                self.index_entries.append((self.index_start, len(self.index_pending)))
+            self.flush()
+        finally:
+            self.write_file.close()
+            self.write_file = None
+            if self.index_file is not None:
+                self.index_file.close()
+                self.index_file = None
+            self.document = []
+            self.index_entries = []
+            self.index_pending = b""
 
-        except FileNotFoundError:
-            print(f"File not found at: {self.file_path}")
-            return []
+        if not self.append:
+            if commit:
+                os.replace(self.tmp_file_path, self.file_path)
+                if self.index_file_path:
+                    os.replace(self.tmp_index_file_path, self.index_file_path)
+            else:
+                os.remove(self.tmp_file_path)
+                if self.index_file_path:
+                    os.remove(self.tmp_index_file_path)
 
-        return contents
 
-    def load_sample_corpus(self) -> List[str]:
-        """Load and read the final corpus for sample text pages."""
+class CorpusReader:
+    """
+    Streaming reader of the final corpus, with a bounded memory use whatever the corpus size.
+
+    The file is read in chunks of chunk_size characters and split on the blank lines that
+    separate the documents, yielding exactly the same texts as read().split('\n\n'). Iterating
+    over the reader yields the (title, url, lines) records of the texts having a url line.
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = 1048576) -> None:
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+
+    def iter_texts(self) -> Iterator[str]:
+        """Yields the texts of the corpus separated by a blank line."""
         try:
-            with open(self.file_path, "r", encoding='utf-8') as load_sample_corpus:
-                contents = load_sample_corpus.read().split('\n\n')
+            with open(self.file_path, "r", encoding="utf-8") as read_file:
+                pending = ""
+                for chunk in iter(lambda: read_file.read(self.chunk_size), ""):
+                    texts = (pending + chunk).split("\n\n")
+                    pending = texts.pop()
+                    yield from texts
+                yield pending
 
         except FileNotFoundError:
             print(f"File not found at: {self.file_path}")
-            return []
-
-        return contents
 
-    def save_corpus(self, text_line: str = None, is_not_eol: bool = True):
-        """ Save the text corpus (append), if it is an EOL then add a new line. """
-        with open(self.file_path, "a", encoding="utf-8") as write_file:
-            if is_not_eol:
-                write_file.write(text_line + "\n")
-            else:
-                write_file.write("\n")
+    def __iter__(self) -> Iterator[Tuple[str, str, List[str]]]:
+        for text in self.iter_texts():
+            lines = text.split("\n")
+            if len(lines) > 1:
+                yield lines[0], lines[1], lines[2:]
 
 
 def get_file_path(path: str, file: str) -> str:
@@ -83,14 +230,25 @@ def get_file_path(path: str, file: str) -> str:
             f"The file or folder does not exist.")
 
 
-def extract_domain(seed_url: str) -> str:
+def get_netloc(url: str) -> str:
+    """Gets the network location (host, with any port or user info) of an url."""
+    try:
+        netloc = urlsplit(url).netloc
+    except ValueError:
+        return url
+    return netloc or url.split("/", 1)[0]
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def extract_host_domain(netloc: str) -> str:
     """
-    Gets the domain name from an url.
+    Gets the domain name from a network location, with the offline extractor. The results
+    are cached per host, evicting the least recently used ones.
 
-    :param seed_url: the input url.
+    :param netloc: the network location of an url.
     :return: the domain or domain with subdomain name.
     """
-    exctracted = tldextract.extract(seed_url)
+    exctracted = _TLD_EXTRACTOR(netloc)
     domain = exctracted.registered_domain
     subdomain = exctracted.subdomain
     if subdomain:
@@ -99,9 +257,26 @@ def extract_domain(seed_url: str) -> str:
     return domain
 
 
-def remove_html_tags(text: str) -> str:
-    """Remove HTML tags found on the given text."""
-    clean = re.compile('<.*?>')
-    text = re.sub(clean, '', text)
-    clean_text = html.unescape(text)
-    return clean_text
+def extract_domain(seed_url: str) -> str:
+    """
+    Gets the domain name from an url.
+
+    :param seed_url: the input url.
+    :return: the domain or domain with subdomain name.
+    """
+    return extract_host_domain(get_netloc(seed_url))
+
+
+def extract_domains(urls: List[str]) -> List[str]:
+    """
+    Gets the domain names of a list of urls, extracting the domain of each distinct url once.
+
+    :param urls: the input urls.
+    :return: the domain or domain with subdomain name of each url.
+    """
+    domains: Dict[str, str] = {}
+    for url in urls:
+        if url not in domains:
+            domains[url] = extract_domain(url)
+
+    return [domains[url] for url in urls]
@@ -0,0 +1,91 @@
+import numpy as np
+from typing import List, Optional, Sequence
+
+#!/usr/bin/env python
+#
+# weighted_sampler.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# Created on 18-10-2026
+
+
+class WeightedSampler:
+    """
+    Weighted sampling without replacement over a fixed distribution.
+
+    The cumulative weights are computed once, so drawing an item is a binary search. A sample
+    of k distinct items is drawn by rejection: items are drawn with replacement and the repeated
+    ones are skipped, which is equivalent to drawing each item proportionally to the weights of
+    the remaining ones. The draws of many samples are vectorized in a single matrix, so
+    producing hundreds of samples costs about the same as producing one. When a few items hold
+    most of the weight and the draws run out, the sample is completed with an exponential race
+    over the remaining items. Items with a zero weight are never sampled.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[str],
+        weights: Sequence[float],
+        rng: Optional[np.random.Generator] = None
+    ) -> None:
+        weights = np.asarray(weights, dtype=np.float64)
+        is_positive = weights > 0
+        self.items = [item for item, positive in zip(items, is_positive) if positive]
+        self.weights = weights[is_positive]
+        self.cumulative_weights = np.cumsum(self.weights)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, k: int) -> List[str]:
+        """
+        Samples k distinct items (fewer if the distribution has fewer items).
+
+        :param k: the number of items.
+        :return: the sampled items, in draw order.
+        """
+
+        return self.sample_many(1, k)[0]
+
+    def sample_many(self, num_samples: int, k: int) -> List[List[str]]:
+        """
+        Draws independent samples of k distinct items each.
+
+        :param num_samples: the number of samples.
+        :param k: the number of items per sample.
+        :return: a list of samples, each in draw order.
+        """
+
+        k = min(k, len(self.items))
+        if num_samples <= 0:
+            return []
+        if k == 0:
+            return [[] for _ in range(num_samples)]
+
+        total_draws = 4 * k + 16
+        draws = self.rng.random((num_samples, total_draws)) * self.cumulative_weights[-1]
+        candidates = np.minimum(
+            np.searchsorted(self.cumulative_weights, draws, side="right"), len(self.items) - 1
+        )
+        samples = []
+        for row in candidates.tolist():
+            indices = list(dict.fromkeys(row))[:k]
+            if len(indices) < k:
+                indices += self.race(indices, k - len(indices))
+            samples.append([self.items[index] for index in indices])
+
+        return samples
+
+    def race(self, excluded: List[int], k: int) -> List[int]:
+        """
+        Draws k distinct indices with an exponential race over the items not excluded: each item
+        gets an exponential random key divided by its weight, and the smallest keys win.
+        """
+
+        weights = self.weights.copy()
+        weights[excluded] = 0
+        with np.errstate(divide="ignore"):
+            keys = self.rng.exponential(size=len(weights)) / weights
+        top_k = np.argpartition(keys, k - 1)[:k] if k < len(keys) else np.arange(len(keys))
+
+        return top_k[np.argsort(keys[top_k])].tolist()[:k]
@@ -1,8 +1,9 @@
 import hydra
 from hydra.core.config_store import ConfigStore
 from common_utils.config import PipelineConfig
+from common_utils.metrics import get_profile_file_path, get_report_file_path, profile_stage
 from common_utils.utils import get_file_path
-from src.get_corpus import GetCorpus
+from src.get_corpus import GetCorpus, parse_shard
 import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -26,15 +27,54 @@ class ConstructCorpus:
             cfg.params.language,
             cfg.params.lang_proba_threshold,
             get_file_path(cfg.paths.lid, cfg.files.lid_model),
-            get_file_path(cfg.paths.data, cfg.files.final_corpus)
+            get_file_path(cfg.paths.data, cfg.files.final_corpus),
+            cfg.params.lid_mmap_mode,
+            cfg.params.lid_batch_size,
+            cfg.params.solr_paging,
+            cfg.params.write_buffer_size,
+            cfg.params.solr_prefetch_pages,
+            get_file_path(cfg.paths.data, cfg.files.dedup_index),
+            cfg.params.near_dup_threshold,
+            cfg.params.near_dup_shingle_size,
+            cfg.params.near_dup_num_perm,
+            cfg.params.near_dup_max_documents,
+            get_file_path(cfg.paths.data, cfg.files.corpus_checkpoint),
+            cfg.params.corpus_checkpoint_pages,
+            cfg.params.corpus_since,
+            cfg.params.corpus_output_format,
+            cfg.params.corpus_output_compression,
+            cfg.params.corpus_output_shard_size,
+            cfg.params.document_log_every,
+            cfg.params.text_normalization_stages,
+            cfg.params.solr_connect_timeout,
+            cfg.params.solr_read_timeout
         )
+        self.corpus_workers = cfg.params.corpus_workers
+        self.corpus_shard = cfg.params.corpus_shard
+        self.corpus_merge_shards = cfg.params.corpus_merge_shards
+        self.corpus_export_text = cfg.params.corpus_export_text
+        self.metrics_file_path = get_report_file_path(cfg.paths.metrics, "corpus", cfg.params.metrics_format)
 
     def run(self) -> None:
         try:
-            self.get_corpus.generate_corpus()
+            if self.corpus_merge_shards:
+                self.get_corpus.merge_shards()
+            elif self.corpus_workers > 1 or self.corpus_shard:
+                shard = parse_shard(self.corpus_shard) if self.corpus_shard else (0, 1)
+                self.get_corpus.generate_corpus_parallel(self.corpus_workers, shard)
+                if shard[1] > 1:
+                    print("\nThe shard files have been generated sucessfully.\n\n")
+                    return
+            else:
+                self.get_corpus.generate_corpus()
+            if self.corpus_export_text:
+                self.get_corpus.export_text()
             print("\nThe final corpus has been generated sucessfully.\n\n")
         except Exception as e:
             print(f"\nError while generating the final corpus: {e}\n")
+            raise
+        finally:
+            self.get_corpus.metrics.save(self.metrics_file_path)
 
 
 cs = ConfigStore.instance()
@@ -43,6 +83,7 @@ if __name__ == "__main__":
     @hydra.main(config_path="conf", config_name="config")
     def main(cfg: PipelineConfig):
         construct_corpus = ConstructCorpus(cfg)
-        construct_corpus.run()
+        with profile_stage(get_profile_file_path(cfg.paths.metrics, "corpus", cfg.params.profile_stages)):
+            construct_corpus.run()
 
     main()
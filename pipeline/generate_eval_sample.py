@@ -1,6 +1,7 @@
 import hydra
 from hydra.core.config_store import ConfigStore
 from common_utils.config import PipelineConfig
+from common_utils.metrics import get_profile_file_path, get_report_file_path, profile_stage
 from common_utils.utils import get_file_path
 from src.get_sample_corpus import GetSampleCorpus
 import warnings
@@ -24,12 +25,15 @@ class GenerateEvalSample:
             cfg.params.total_samples,
             cfg.params.total_text_pages
         )
+        self.metrics_file_path = get_report_file_path(cfg.paths.metrics, "sample", cfg.params.metrics_format)
 
     def run(self):
         try:
             self.generate_eval_sample.generate_sample()
         except ValueError as e:
             print(f"Insuficient sample: {e}")
+        finally:
+            self.generate_eval_sample.metrics.save(self.metrics_file_path)
 
 
 cs = ConfigStore.instance()
@@ -38,6 +42,7 @@ if __name__ == "__main__":
     @hydra.main(config_path="conf", config_name="config")
     def main(cfg: PipelineConfig):
         eval_samples = GenerateEvalSample(cfg)
-        eval_samples.run()
+        with profile_stage(get_profile_file_path(cfg.paths.metrics, "sample", cfg.params.profile_stages)):
+            eval_samples.run()
 
     main()
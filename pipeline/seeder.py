@@ -1,6 +1,8 @@
 import hydra
 from src.get_seed_url import GetSeedUrl
 from src.get_seed_word import GetSeedWords
+from common_utils.search_backend import SearchFanOut, get_search_backend
+from common_utils.metrics import Metrics, get_profile_file_path, get_report_file_path, profile_stage
 from hydra.core.config_store import ConfigStore
 from common_utils.config import PipelineConfig
 from common_utils.utils import get_file_path
@@ -26,24 +28,62 @@ class MainSeeder:
             get_file_path(cfg.paths.lid, cfg.files.lid_model),
             cfg.params.lang_proba_threshold,
             cfg.params.num_seed_word_sample,
-            get_file_path(cfg.paths.data, cfg.files.seed_words)
+            get_file_path(cfg.paths.data, cfg.files.seed_words),
+            cfg.params.lid_mmap_mode,
+            get_file_path(cfg.paths.data, cfg.files.lid_verdict_cache)
         )
         self.get_url = GetSeedUrl(
             cfg.params.extensions_to_exclude,
             cfg.params.domains_to_exclude,
-            self.get_seed_word.generate_seed_words(),
             cfg.params.google_search_num_result,
             cfg.params.max_seed_url_length,
             get_file_path(cfg.paths.nutch, cfg.files.nutch_seed_url),
-            get_file_path(cfg.paths.data, cfg.files.domain)
+            get_file_path(cfg.paths.data, cfg.files.domain),
+            SearchFanOut(
+                get_search_backend(cfg.params.search_backend, cfg.params.search_fixture_file),
+                cfg.params.search_max_concurrency,
+                cfg.params.search_rate_per_second,
+                cfg.params.search_burst
+            )
         )
+        self.metrics = Metrics("seeder")
+        self.metrics_file_path = get_report_file_path(cfg.paths.metrics, "seeder", cfg.params.metrics_format)
 
-    def run(self) -> None:
+    def run(self, iterations: int = 1) -> None:
+        """
+        Generates the seed words of all the iterations at once, from a single sample of the
+        initial corpus, and then the seed URLs of each iteration.
+
+        :param iterations: the number of seed queries, searched concurrently.
+        """
+        try:
+            self.generate_seeds(iterations)
+        finally:
+            self.metrics.save(self.metrics_file_path)
+
+    def generate_seeds(self, iterations: int) -> None:
+        """Generates the seed queries, searches them and saves the seed URLs of each one."""
         try:
-            self.get_url.generate_seed_urls()
-            print(f"\nSeed URLs have been generated successfully.\n\n")
+            with self.metrics.timer("seed_words"):
+                seed_queries = self.get_seed_word.generate_seed_queries(iterations)
         except Exception as e:
-            print(f"\nError while generating the seed URLs: {e}\n")
+            self.metrics.increment("errors", step="seed_words")
+            print(f"\nError while generating the seed words: {e}\n")
+            return
+        self.metrics.increment("seed_queries", len(seed_queries))
+
+        with self.metrics.timer("search"):
+            search_results = self.get_url.search(seed_queries)
+        for i, (seed_words, urls) in enumerate(zip(seed_queries, search_results), 1):
+            print(f"\nGenerating seed URLs for the {i} time ...")
+            self.metrics.increment("search_results", len(urls))
+            try:
+                with self.metrics.timer("seed_urls"):
+                    self.get_url.generate_seed_urls(seed_words, urls)
+                print(f"\nSeed URLs have been generated successfully.\n\n")
+            except Exception as e:
+                self.metrics.increment("errors", step="seed_urls")
+                print(f"\nError while generating the seed URLs: {e}\n")
 
 
 cs = ConfigStore.instance()
@@ -52,6 +92,7 @@ if __name__ == "__main__":
     @hydra.main(config_path="conf", config_name="config")
     def main(cfg: PipelineConfig):
         seeder = MainSeeder(cfg)
-        seeder.run()
+        with profile_stage(get_profile_file_path(cfg.paths.metrics, "seeder", cfg.params.profile_stages)):
+            seeder.run(cfg.params.seeder_runs)
 
     main()
@@ -1,13 +1,14 @@
 import os
-import requests
-import numpy as np
 import logging
 import warnings
+from collections import Counter, deque
 from pathlib import Path
-from bs4 import BeautifulSoup
-from bs4.builder import ParserRejectedMarkup
-from requests import exceptions
-from common_utils.utils import Utils, extract_domain
+from typing import Dict, Iterable, Iterator, Tuple
+from common_utils.link_extractor import LinkExtractor, count_links
+from common_utils.link_fetcher import LinkFetcher
+from common_utils.metrics import Metrics
+from common_utils.nutch_dump import iter_linkdb_inlinks, iter_segment_outlinks
+from common_utils.utils import CorpusReader, CorpusWriter, extract_domain
 
 warnings.filterwarnings("ignore")
 
@@ -21,7 +22,8 @@ warnings.filterwarnings("ignore")
 class CollectionStatistic:
     """ 
     This class generates the corpus summary comprises:
-    (1) Total inlinks and outlinks per document (url).
+    (1) Total inlinks and outlinks per document (url), from the fetched web pages
+        or, offline, from the dumps of the Nutch linkdb and segments.
     (2) Total documents.  
     (3) Total documents per domain.
     (4) Total documents per extension.
@@ -31,110 +33,206 @@ class CollectionStatistic:
         self,
         final_corpus_file_path: Path,
         url_in_out_links_file_path: Path,
-        stats_in_out_links_file_path: Path
+        stats_in_out_links_file_path: Path,
+        fetcher_params: Dict = None,
+        stats_source: str = "fetch",
+        linkdb_dump_path: Path = None,
+        segment_dump_path: Path = None
     ) -> None:
-        self.final_corpus_file_path = Utils(final_corpus_file_path)
-        self.url_in_out_links = Utils(url_in_out_links_file_path)
-        self.stats_in_out_links_file_path = Utils(stats_in_out_links_file_path)
+        self.final_corpus = CorpusReader(final_corpus_file_path)
+        self.url_in_out_links_file_path = url_in_out_links_file_path
+        self.stats_in_out_links_file_path = stats_in_out_links_file_path
+        self.fetcher_params = fetcher_params or {}
+        self.link_extractor = LinkExtractor()
+        self.stats_source = stats_source
+        self.linkdb_dump_path = linkdb_dump_path
+        self.segment_dump_path = segment_dump_path
+        self.metrics = Metrics("stats")
         logging.basicConfig(
             level=logging.DEBUG,
             format="%(asctime)s %(levelname)s: %(message)s"
         )
 
-    def generate_stats(self) -> None:
-        """Load the final corpus and get the URLs, extract domains and extensions as well as inlinks and outlinks."""
+    def count_links(self, content: bytes, domain: str) -> Tuple[int, int]:
+        """
+        Counts the outlinks and inlinks of a web page, streaming through its markup.
 
-        logging.info("Generating statistics for the collection...")
-        corpus = self.final_corpus_file_path.load_final_corpus()
-        domain_counts = {}
-        extension_counts = {}
-        outlink_count_list = []
-        inlink_count_list = []
-        total_documents = 0
-        for conten in corpus.split('\n\n'):
-            try:
-                url = conten.split('\n')[1].strip()
-                total_documents += 1
-                # Domains
-                domain = extract_domain(url)
-                if domain in domain_counts:
-                    domain_counts[domain] += 1
-                else:
-                    domain_counts[domain] = 1
-
-                # Extensions - extract the last part of the URL
-                filename = os.path.basename(url)
-                extension = os.path.splitext(
-                    filename)[1].lower() if '.' in filename else ''
-                # Uniformize the Ms. Office extensions
-                if extension == 'doc':
-                    extension = 'docx'
-                elif extension == 'xls':
-                    extension = 'xlsx'
-                elif extension in ['ppt', 'pps', 'ppsx']:
-                    extension = 'pptx'
-
-                if extension in extension_counts:
-                    extension_counts[extension] += 1
-                else:
-                    extension_counts[extension] = 1
+        :param content: the body of the web page.
+        :param domain: the domain of the web page.
+        :return: the number of outlinks and of inlinks.
+        """
+
+        return count_links(self.link_extractor.extract_hrefs(content), domain)
+
+    def iter_documents(self, domain_counts: Counter, extension_counts: Counter) -> Iterator[Tuple[str, str]]:
+        """
+        Streams the urls of the final corpus, counting the documents per domain and per
+        extension on the way.
+
+        :param domain_counts: the counts of documents per domain, updated in place.
+        :param extension_counts: the counts of documents per extension, updated in place.
+        :return: an iterator of (url, domain), in the corpus order.
+        """
+
+        for _, url, _ in self.final_corpus:
+            url = url.strip()
+            domain = extract_domain(url)
+            domain_counts[domain] += 1
+            extension_counts[get_extension(url)] += 1
+            yield url, domain
 
+    def iter_fetched_link_counts(self, documents: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, int, int]]:
+        """
+        Fetches the web pages concurrently and counts their links: the absolute links to other
+        domains are outlinks, the other links (including the relative ones) are inlinks.
+
+        :param documents: the (url, domain) of the documents.
+        :return: an iterator of (url, outlinks, inlinks), for the pages fetched successfully.
+        """
+
+        domains = deque()  # Domains of the urls read ahead by the fetcher
+
+        def iter_urls() -> Iterator[str]:
+            for url, domain in documents:
+                domains.append(domain)
+                yield url
+
+        with LinkFetcher(**self.fetcher_params) as link_fetcher:
+            for url, content in link_fetcher.fetch_many(iter_urls()):
+                domain = domains.popleft()
+                if content is None:
+                    continue
                 try:
-                    # Outlinks and Inlinks for each URL
-                    response = requests.get(url)
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        links = soup.find_all('a')
-
-                        outlink_count = 0
-                        inlink_count = 0
-                        for link in links:
-                            href = link.get('href')
-                            if href and (href.startswith('http://') or href.startswith('https://')):
-                                if domain not in href:
-                                    outlink_count += 1
-                                else:
-                                    inlink_count += 1
-                            elif href and not href.startswith('#'):
-                                inlink_count += 1
-
-                        outlink_count_list.append(outlink_count)
-                        inlink_count_list.append(inlink_count)
-                        self.url_in_out_links.save_corpus(
-                            f"Url: {url}, Outlink: {outlink_count}, Inlink: {inlink_count}")
-                    else:
-                        continue
-                except (exceptions.RequestException, exceptions.ConnectionError, exceptions.HTTPError, exceptions.Timeout,
-                        exceptions.TooManyRedirects, exceptions.URLRequired, ParserRejectedMarkup, AssertionError):
+                    outlink_count, inlink_count = self.count_links(content, domain)
+                except AssertionError:
                     continue
-            except IndexError:
-                continue
+                yield url, outlink_count, inlink_count
+        for stat, value in link_fetcher.stats.items():
+            self.metrics.increment("pages", value, status=stat)
+        logging.info(f"Fetched pages: {link_fetcher.stats}")
+
+    def iter_nutch_link_counts(self, documents: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, int, int]]:
+        """
+        Counts the links of the documents offline, from the dumps of the Nutch crawl data:
+        the outlinks to other domains parsed by Nutch (segment dumps), and the inlinks from
+        other pages (linkdb dump, which leaves out the internal links by default). The link
+        counts of the crawled pages are read from the dumps first, so the corpus is streamed.
+
+        :param documents: the (url, domain) of the documents.
+        :return: an iterator of (url, outlinks, inlinks), for the pages parsed by Nutch.
+        """
+
+        outlink_counts = {}
+        for url, outlinks in iter_segment_outlinks(self.segment_dump_path):
+            domain = extract_domain(url)
+            outlink_counts[url] = sum(1 for outlink in outlinks if extract_domain(outlink) != domain)
+
+        inlink_counts = {}
+        for url, inlinks in iter_linkdb_inlinks(self.linkdb_dump_path):
+            inlink_counts[url] = inlinks
+
+        total_documents, parsed_documents = 0, 0
+        for url, _ in documents:
+            total_documents += 1
+            if url in outlink_counts:
+                parsed_documents += 1
+                yield url, outlink_counts[url], inlink_counts.get(url, 0)
+        logging.info(f"Documents parsed by Nutch: {parsed_documents} of {total_documents}")
+
+    def generate_stats(self) -> None:
+        """Stream the final corpus and get the URLs, extract domains and extensions as well as inlinks and outlinks."""
+
+        logging.info("Generating statistics for the collection...")
+        domain_counts = Counter()
+        extension_counts = Counter()
+        outlinks = LinkCountSummary()
+        inlinks = LinkCountSummary()
+
+        # Domains and extensions, counted while the documents are streamed to the link counts
+        documents = self.iter_documents(domain_counts, extension_counts)
+
+        # Outlinks and Inlinks for each URL
+        if self.stats_source == "nutch":
+            link_counts = self.iter_nutch_link_counts(documents)
+        else:
+            link_counts = self.iter_fetched_link_counts(documents)
+        with self.metrics.timer("link_counts"), \
+                CorpusWriter(self.url_in_out_links_file_path, append=False) as url_in_out_links:
+            for url, outlink_count, inlink_count in link_counts:
+                outlinks.add(outlink_count)
+                inlinks.add(inlink_count)
+                url_in_out_links.save_corpus(
+                    f"Url: {url}, Outlink: {outlink_count}, Inlink: {inlink_count}")
+                url_in_out_links.end_document()
+        total_documents = sum(domain_counts.values())
+        self.metrics.increment("documents_read", total_documents)
+        self.metrics.increment("documents_linked", outlinks.count)
+        if not outlinks.count:
+            raise ValueError("No web page of the collection to count the links of.")
 
         # Save the inlinks and outlinks summary
         stat_inlinks_outlinks = f"""Statistics of the collection:
         ========================================
         Total web pages (urls) processed: {total_documents}\n
-        Max outlinks: {max(outlink_count_list)}, Min outlinks: {min(outlink_count_list)}, Average oulinks: {np.mean(outlink_count_list):.2f}
-        Max inlinks: {max(inlink_count_list)}, Min inlinks: {min(inlink_count_list)}, Average inlinks: {np.mean(inlink_count_list):.2f}
+        Max outlinks: {outlinks.max}, Min outlinks: {outlinks.min}, Average oulinks: {outlinks.get_mean():.2f}
+        Max inlinks: {inlinks.max}, Min inlinks: {inlinks.min}, Average inlinks: {inlinks.get_mean():.2f}
         ========================================
         """
-        self.stats_in_out_links_file_path.save_corpus(
-            stat_inlinks_outlinks.strip())
-
-        self.stats_in_out_links_file_path.save_corpus(
-            f"\n========= Domain: total documents in the corresponding domain =========")
-        sorted_domain_items = sorted(
-            domain_counts.items(), key=lambda x: x[1], reverse=True)
-        for domain, count in sorted_domain_items:
-            self.stats_in_out_links_file_path.save_corpus(
-                f"Domain: {domain}, total_docs: {count}")
-
-        self.stats_in_out_links_file_path.save_corpus(
-            f"\n========= Extension: total documents with the corresponding extension =========")
-        sorted_extension_items = sorted(
-            extension_counts.items(), key=lambda x: x[1], reverse=True)
-        for extension, count in sorted_extension_items:
-            self.stats_in_out_links_file_path.save_corpus(
-                f"Extension: {extension}, total_docs: {count}")
+        with self.metrics.timer("write"), \
+                CorpusWriter(self.stats_in_out_links_file_path, append=False) as stats_in_out_links:
+            stats_in_out_links.save_corpus(
+                stat_inlinks_outlinks.strip())
+
+            stats_in_out_links.save_corpus(
+                f"\n========= Domain: total documents in the corresponding domain =========")
+            sorted_domain_items = sorted(
+                domain_counts.items(), key=lambda x: x[1], reverse=True)
+            for domain, count in sorted_domain_items:
+                stats_in_out_links.save_corpus(
+                    f"Domain: {domain}, total_docs: {count}")
+
+            stats_in_out_links.save_corpus(
+                f"\n========= Extension: total documents with the corresponding extension =========")
+            sorted_extension_items = sorted(
+                extension_counts.items(), key=lambda x: x[1], reverse=True)
+            for extension, count in sorted_extension_items:
+                stats_in_out_links.save_corpus(
+                    f"Extension: {extension}, total_docs: {count}")
 
         logging.info("The statistics have been generated sucessfully.")
+
+
+class LinkCountSummary:
+    """Running maximum, minimum and mean of the link counts of the web pages."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.max = None
+        self.min = None
+
+    def add(self, link_count: int) -> None:
+        self.count += 1
+        self.total += link_count
+        self.max = link_count if self.max is None else max(self.max, link_count)
+        self.min = link_count if self.min is None else min(self.min, link_count)
+
+    def get_mean(self) -> float:
+        return self.total / self.count
+
+
+def get_extension(url: str) -> str:
+    """Gets the extension of the last part of a URL, with the Ms. Office extensions uniformized."""
+
+    filename = os.path.basename(url)
+    extension = os.path.splitext(
+        filename)[1].lower() if '.' in filename else ''
+    # Uniformize the Ms. Office extensions
+    if extension == 'doc':
+        extension = 'docx'
+    elif extension == 'xls':
+        extension = 'xlsx'
+    elif extension in ['ppt', 'pps', 'ppsx']:
+        extension = 'pptx'
+
+    return extension
@@ -1,9 +1,26 @@
+import os
+import glob
+import heapq
 import requests
 import json
 import logging
+import multiprocessing
+import numpy as np
+from contextlib import closing
+from collections import Counter
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+from common_utils.corpus_index import get_index_file_path, truncate_corpus_index
+from common_utils.dedup_index import DedupIndex
+from common_utils.jsonl_shards import JsonlShardWriter, iter_jsonl_records, truncate_jsonl_shards
+from common_utils.metrics import Metrics, SampledLog
+from common_utils.near_dup import NearDuplicateFilter
+from common_utils.prefetch import Prefetcher
 from common_utils.tetun_lid import TetunLid
-from common_utils.utils import Utils, remove_html_tags
+from common_utils.text_normalizer import NORMALIZATION_STAGES, TextNormalizer
+from common_utils.utils import CorpusWriter, extract_domain
 
 #!/usr/bin/env python
 #
@@ -16,8 +33,8 @@ class GetCorpus:
     """
     This class:
     (1) Retrieves and load each document from Solr.
-    (2) Applies the LID model for each document title and collects only those that satisfy the predefined threshold.
-    (3) Saves each title with the respective URL to the final corpus file and applies the LID model to its content.
+    (2) Applies the LID model to the titles of each page of documents and collects only those that satisfy the predefined threshold.
+    (3) Saves each title with the respective URL to the final corpus file and applies the LID model to the page content in one batch.
     (3) Saves each line on the content that satisfies the predefined threshold to the final corpus file.
     """
 
@@ -30,123 +47,734 @@ class GetCorpus:
         tetun_lang: str,
         lang_proba_threshold: float,
         lid_model_file_path: Path,
-        final_corpus_file_path: Path
+        final_corpus_file_path: Path,
+        lid_mmap_mode: str = None,
+        lid_batch_size: int = None,
+        solr_paging: str = "cursor",
+        write_buffer_size: int = 1048576,
+        solr_prefetch_pages: int = 0,
+        dedup_index_file_path: Path = None,
+        near_dup_threshold: float = None,
+        near_dup_shingle_size: int = 5,
+        near_dup_num_perm: int = 64,
+        near_dup_max_documents: int = 1000000,
+        checkpoint_file_path: Path = None,
+        checkpoint_pages: int = 100,
+        since: str = None,
+        output_format: str = "text",
+        output_compression: str = "gzip",
+        output_shard_size: int = 268435456,
+        document_log_every: int = 1000,
+        normalization_stages: List[str] = NORMALIZATION_STAGES,
+        solr_connect_timeout: float = 5,
+        solr_read_timeout: float = 60
     ) -> None:
         self.solr_api_url = solr_api_url
-        self.solr_start = solr_start,
-        self.solr_rows = solr_rows,
-        self.max_consecutive_newlines = max_consecutive_newlines,
+        self.solr_start = solr_start
+        self.solr_rows = solr_rows
+        self.solr_paging = solr_paging
+        self.solr_timeout = (solr_connect_timeout, solr_read_timeout)
+        self.text_normalizer = TextNormalizer(max_consecutive_newlines, normalization_stages)
         self.tetun_lang = tetun_lang
         self.tetun_lid = TetunLid(
-            tetun_lang, lang_proba_threshold, lid_model_file_path)
-        self.final_corpus = Utils(final_corpus_file_path)
+            tetun_lang, lang_proba_threshold, lid_model_file_path, lid_mmap_mode)
+        self.lid_batch_size = lid_batch_size
+        self.final_corpus_file_path = final_corpus_file_path
+        self.final_corpus_index_file_path = get_index_file_path(final_corpus_file_path)
+        self.write_buffer_size = write_buffer_size
+        self.solr_prefetch_pages = solr_prefetch_pages
+        self.stage_metrics = {}
+        self.dedup_index = DedupIndex(dedup_index_file_path)
+        self.near_dup_filter = None
+        if near_dup_threshold:
+            self.near_dup_filter = NearDuplicateFilter(
+                near_dup_shingle_size, near_dup_num_perm, near_dup_threshold, near_dup_max_documents)
+        self.near_duplicates = Counter()
+        self.checkpoint_file_path = checkpoint_file_path
+        self.checkpoint_pages = checkpoint_pages
+        self.since = parse_since(since) if since else None
+        if output_format not in ("text", "jsonl"):
+            raise ValueError(f"Unknown output format: {output_format}, expected 'text' or 'jsonl'")
+        self.output_format = output_format
+        self.output_prefix = os.path.splitext(str(final_corpus_file_path))[0]
+        self.output_compression = output_compression
+        self.output_shard_size = output_shard_size
+        self.metrics = Metrics("corpus")
+        self.document_log = SampledLog(document_log_every)
+        self.session = requests.Session()
         logging.basicConfig(
             level=logging.DEBUG,
             format="%(asctime)s %(levelname)s: %(message)s"
         )
 
-    def get_total_documents(self) -> int:
+    def get_total_documents(self, filter_queries: List[str] = None) -> int:
         """Gets total of documents from Solr and return it."""
 
-        params = {"q": "*:*", "rows": self.solr_rows}
-        response = requests.get(self.solr_api_url, params=params)
+        params = {"q": "*:*", "fq": filter_queries or [], "rows": 0}
+        response = self.session.get(self.solr_api_url, params=params, timeout=self.solr_timeout)
+        response.raise_for_status()
         response_json = response.json()
         total_doc = response_json["response"]["numFound"]
 
         return total_doc
 
-    def generate_corpus(self) -> None:
+    def get_documents(self, params: dict) -> dict:
         """
-        (1) Retrieve and load each document from the Solr. 
-        (2) Apply the Tetun LID model to the document title and collect only those with a probability >= threshold.
-        (3) Save title, url and its content that has a proba >= threshold to the final corpus file.
-        (4) Add a newline to the end of each document.
+        Retrieves a page of documents from Solr and returns the decoded response. A Solr that
+        does not answer within the connect and read timeouts raises a requests Timeout, like
+        the HTTP errors, so the run stops and can resume from its last checkpoint.
         """
 
-        logging.info("Getting and loading json data from Solr...")
+        with self.metrics.timer("solr_fetch"):
+            response = self.session.get(self.solr_api_url, params=params, timeout=self.solr_timeout)
+            response.raise_for_status()
+            text = response.text
+        with self.metrics.timer("json_decode"):
+            return json.loads(text)
+
+    def iter_solr_pages(
+        self, filter_queries: List[str] = None, cursor: Union[str, int] = None
+    ) -> Iterator[Tuple[List[dict], Union[str, int]]]:
+        """
+        Yields the Solr documents page by page, with the cursor of the next page.
+
+        In the "cursor" paging mode (default), the documents are walked with a cursorMark
+        over a stable sort on the id field, so each page costs the same regardless of its depth.
+        In the "start" paging mode, the start offset is advanced by solr_rows from solr_start.
+        The total number of documents is only requested once, for the progress report.
+
+        :param filter_queries: optional Solr filter queries (fq) restricting the documents.
+        :param cursor: the cursorMark or the start offset to resume from.
+        """
+
+        filter_queries = filter_queries or []
+        total_documents = self.get_total_documents(filter_queries)
+        logging.info(f"Total documents in Solr: {total_documents}")
         params = {
             "q": "*:*",
+            "fq": filter_queries,
             "wt": "json",
-            "start": self.solr_start,
             "rows": self.solr_rows
         }
 
-        list_of_titles = []
-        start = self.solr_start[0]
-        while start < self.get_total_documents():
-            params["start"] = start
-            response = requests.get(self.solr_api_url, params=params)
-            data = json.loads(response.text)
-            docs = data["response"]["docs"]
-
-            for doc in docs:
-                logging.info("Generating titles...")
-                if not doc.get("title") is None:
-                    get_title = doc.get("title")
-
-                logging.info("Validating titles...")
-                valid_title = self.tetun_lid.get_tetun_text(
-                    [get_title])  # Apply the Tetun LID model
-
-                if valid_title and not get_title in list_of_titles:  # Avoid title duplication
-                    list_of_titles.append(get_title)
-
-                    logging.info("Generating page content...")
-                    get_url = doc.get("url")
-                    get_content = doc.get("content")
-
-                    # Exclude the Urls contain '/feed' and '/tag'.
-                    if not '/feed' in get_url and not '/tag' in get_url:
-                        # Ensure that only Tetun wikipedia data is processed.
-                        if "wikipedia" in get_url and not self.tetun_lang in get_url:
-                            logging.warning(
-                                f"Not Tetun Wikipedia -> {get_url}.")
-                            continue
-                        # Excluding facebook since its content was not extracted by Nutch.
-                        if "facebook" in get_url:
-                            logging.warning(f"Facebook page -> {get_url}.")
-                            continue
-
-                        if get_content is None:  # Make sure that the content is not empty.
-                            logging.warning(f"Empty content -> {get_title}.")
-                            continue
-
-                        self.final_corpus.save_corpus(get_title.strip())
-                        self.final_corpus.save_corpus(get_url.strip())
-
-                        consecutive_newlines = 0
-                        seen_sentences = set()
-                        text_lines = get_content.split("\n")
-                        tetun_text = self.tetun_lid.get_tetun_text(
-                            text_lines)  # Apply the Tetun LID model
-                        for index, doc in enumerate(tetun_text):
-                            # Remove HTML tags if exist on the given text
-                            text_line = remove_html_tags(doc.strip())
-                            if text_line not in seen_sentences:
-                                if len(text_line) == 0:
-                                    consecutive_newlines += 1
-                                else:
-                                    consecutive_newlines = 0
-                                if len(text_line) == 0 and consecutive_newlines == self.max_consecutive_newlines:
-                                    continue
-                                else:
-                                    self.final_corpus.save_corpus(text_line)
-                                    # Add a new line at the end of each non-empty document
-                                    if index == len(tetun_text) - 1:
-                                        self.final_corpus.save_corpus(
-                                            is_not_eol=False)
-                                    if len(text_line) > 0:
-                                        seen_sentences.add(text_line)
-                        logging.info(
-                            f"The content was sucessfully generated for the title -> {get_title}")
-                    else:
-                        logging.warning(
-                            f"The URL contains 'feed' or 'tag' -> {get_url}")
-                else:
-                    logging.warning(
-                        f"The title is not in Tetun -> {get_title}")
-
-            # Retrieve the next doc from Solr by incrementing 1 to the start value.
-            start += 1
+        fetched_documents = 0
+        if self.solr_paging == "cursor":
+            params["sort"] = "id asc"
+            params["cursorMark"] = cursor or "*"
+            while True:
+                data = self.get_documents(params)
+                docs = data["response"]["docs"]
+                next_cursor_mark = data["nextCursorMark"]
+                if docs:
+                    fetched_documents += len(docs)
+                    self.metrics.increment("documents_fetched", len(docs))
+                    logging.info(f"Fetched {fetched_documents}/{total_documents} documents.")
+                    yield docs, next_cursor_mark
+                if next_cursor_mark == params["cursorMark"]:
+                    break
+                params["cursorMark"] = next_cursor_mark
+        elif self.solr_paging == "start":
+            start = self.solr_start if cursor is None else cursor
+            while start < total_documents:
+                params["start"] = start
+                docs = self.get_documents(params)["response"]["docs"]
+                if not docs:
+                    break
+                fetched_documents += len(docs)
+                self.metrics.increment("documents_fetched", len(docs))
+                logging.info(f"Fetched {fetched_documents}/{total_documents} documents.")
+                start += self.solr_rows
+                yield docs, start
+        else:
+            raise ValueError(f"Unknown Solr paging mode: {self.solr_paging}")
+
+    def select_documents(self, docs: List[dict]) -> List[dict]:
+        """
+        Applies the Tetun LID model to the titles of a page of documents in a single call
+        and checks the URL exclusion rules.
+
+        The documents whose title or url is already in the deduplication index are
+        flagged as duplicates upfront.
+
+        :param docs: a page of documents retrieved from Solr.
+        :return: one record per document, in the Solr order, whose "reason" is None
+            when the document is selected or the reason why it was rejected.
+        """
+
+        logging.info("Validating titles...")
+        known_docs = [
+            doc.get("title") is not None and self.is_known_document(doc.get("title"), doc.get("url"))
+            for doc in docs
+        ]
+        titles = [
+            doc.get("title") for doc, is_known in zip(docs, known_docs)
+            if doc.get("title") is not None and not is_known
+        ]
+        with self.metrics.timer("lid"):
+            title_probs = self.tetun_lid.get_tetun_proba(
+                titles, self.lid_batch_size)  # Apply the Tetun LID model
+        valid_titles = iter(zip(self.tetun_lid.is_tetun(title_probs), title_probs))
+
+        records = []
+        for doc, is_known in zip(docs, known_docs):
+            get_title = doc.get("title")
+            get_url = doc.get("url")
+            reason = None
+            is_tetun_title, title_prob = False, None
+            if get_title is not None and not is_known:
+                is_tetun_title, title_prob = next(valid_titles)
+            if get_title is None:
+                self.document_log.debug("missing_title", "Missing title -> %s", get_url)
+                reason = "missing_title"
+            elif is_known:  # Skip the documents processed before, without applying the LID model
+                self.document_log.debug("duplicate", "Duplicated document -> %s", get_url)
+                reason = "duplicate"
+            elif not is_tetun_title:
+                self.document_log.debug("non_tetun_title", "The title is not in Tetun -> %s", get_title)
+                reason = "non_tetun_title"
+            # Exclude the Urls contain '/feed' and '/tag'.
+            elif '/feed' in get_url or '/tag' in get_url:
+                self.document_log.debug("feed_or_tag", "The URL contains 'feed' or 'tag' -> %s", get_url)
+                reason = "feed_or_tag"
+            # Ensure that only Tetun wikipedia data is processed.
+            elif "wikipedia" in get_url and not self.tetun_lang in get_url:
+                self.document_log.debug("non_tetun_wikipedia", "Not Tetun Wikipedia -> %s", get_url)
+                reason = "non_tetun_wikipedia"
+            # Excluding facebook since its content was not extracted by Nutch.
+            elif "facebook" in get_url:
+                self.document_log.debug("facebook", "Facebook page -> %s", get_url)
+                reason = "facebook"
+            elif doc.get("content") is None:  # Make sure that the content is not empty.
+                self.document_log.debug("empty_content", "Empty content -> %s", get_title)
+                reason = "empty_content"
+
+            records.append({
+                "id": doc.get("id"),
+                "title": get_title,
+                "url": get_url,
+                "content": doc.get("content"),
+                "lid_title": None if title_prob is None else round(float(title_prob), 4),
+                "reason": reason
+            })
+
+        return records
+
+    def is_known_document(self, title: str, url: str) -> bool:
+        """Checks if the title or the url of a document is in the deduplication index."""
+
+        return self.dedup_index.contains("title", title) or self.dedup_index.contains("url", url)
+
+    def deduplicate(self, records: List[dict]) -> None:
+        """
+        Flags the records whose Tetun title or url is in the deduplication index as duplicates
+        and adds the others to the index. Every Tetun title is claimed by its first document,
+        even when that document is excluded by its URL.
+
+        :param records: the records returned by select_documents, updated in place.
+        """
+
+        for record in records:
+            if record["reason"] in ("missing_title", "non_tetun_title", "duplicate"):
+                continue
+            if self.is_known_document(record["title"], record["url"]):  # Avoid document duplication
+                self.document_log.debug("duplicate", "Duplicated document -> %s", record['url'])
+                record["reason"] = "duplicate"
+                continue
+            self.dedup_index.add("title", record["title"])
+            self.dedup_index.add("url", record["url"])
+
+    def is_new_content(self, record: dict) -> bool:
+        """
+        Checks if the cleaned content of a selected record is new and adds it to the
+        deduplication index; a record with a duplicated content is flagged as a duplicate.
+        """
+
+        content = "\n".join(record["lines"])
+        if not content.strip() or self.dedup_index.add("content", content):
+            return True
+        self.document_log.debug("duplicate", "Duplicated content -> %s", record['url'])
+        record["reason"] = "duplicate"
+
+        return False
+
+    def is_near_duplicate(self, record: dict) -> bool:
+        """
+        Checks if a selected record is a near duplicate of a document already saved in this run,
+        using its MinHash signature, and counts the near duplicates per domain.
+        """
+
+        if self.near_dup_filter is None or "minhash" not in record:
+            return False
+        signature = np.asarray(record["minhash"], dtype=np.uint32)
+        if not self.near_dup_filter.check_and_add(signature):
+            return False
+        self.document_log.debug("near_duplicate", "Near-duplicate document -> %s", record['url'])
+        record["reason"] = "near_duplicate"
+        self.near_duplicates[extract_domain(record["url"])] += 1
+
+        return True
+
+    def report_near_duplicates(self) -> None:
+        """Logs the number of near-duplicate documents dropped, in total and per domain."""
+
+        if self.near_dup_filter is None:
+            return
+        logging.info(f"Near-duplicate documents dropped: {sum(self.near_duplicates.values())}")
+        for domain, count in self.near_duplicates.most_common():
+            logging.info(f"Near-duplicate documents dropped -> domain: {domain}, total_docs: {count}")
+
+    def classify_lines(self, records: List[dict]) -> List[List[str]]:
+        """
+        Applies the Tetun LID model to every content line of the given records at once
+        and splits the accepted lines back per record. The mean probability of the accepted
+        lines of each record is set as its "lid_content" score (None without accepted lines).
+
+        :param records: the selected records, updated in place.
+        :return: for each record, its lines with a probability >= threshold.
+        """
+
+        text_lines = []
+        boundaries = [0]
+        for record in records:
+            text_lines.extend(record["content"].split("\n"))
+            boundaries.append(len(text_lines))
+
+        with self.metrics.timer("lid"):
+            tetun_probs = self.tetun_lid.get_tetun_proba(
+                text_lines, self.lid_batch_size)  # Apply the Tetun LID model
+        tetun_mask = self.tetun_lid.is_tetun(tetun_probs)
+
+        tetun_texts = []
+        for record, begin, end in zip(records, boundaries, boundaries[1:]):
+            accepted_probs = tetun_probs[begin:end][tetun_mask[begin:end]]
+            record["lid_content"] = round(float(accepted_probs.mean()), 4) if len(accepted_probs) else None
+            tetun_texts.append([
+                line for line, is_tetun in zip(text_lines[begin:end], tetun_mask[begin:end]) if is_tetun])
+
+        return tetun_texts
+
+    def process_page(self, docs: List[dict]) -> List[dict]:
+        """
+        Runs the title LID, the URL rules, the content LID and the line cleaning over a page
+        of Solr documents. The deduplication within the run is left to write_record, which
+        handles the records in order.
+
+        :param docs: a page of documents retrieved from Solr.
+        :return: one record per document; the selected ones carry the cleaned "lines".
+        """
+
+        records = self.select_documents(docs)
+        selected_records = [record for record in records if record["reason"] is None]
+        tetun_texts = self.classify_lines(selected_records)
+        with self.metrics.timer("normalize"):
+            document_lines = self.text_normalizer.normalize_batch(tetun_texts)
+        for record, lines in zip(selected_records, document_lines):
+            record["lines"] = lines
+            if self.near_dup_filter is not None and any(record["lines"]):
+                with self.metrics.timer("minhash"):
+                    record["minhash"] = self.near_dup_filter.get_signature(
+                        " ".join(record["lines"])).tolist()
+        for record in records:
+            del record["content"]
+
+        return records
+
+    def iter_processed_pages(
+        self, filter_queries: List[str] = None, cursor: Union[str, int] = None
+    ) -> Iterator[Tuple[List[dict], Union[str, int]]]:
+        """
+        Yields the processed records of each Solr page, in the Solr order, with the cursor
+        of the next page.
+
+        With solr_prefetch_pages > 0, the pages are fetched and decoded in a background thread
+        and processed (LID and cleaning) in another one, each stage keeping up to
+        solr_prefetch_pages pages ahead of the next one, while the caller writes the records.
+        The queue metrics of each stage are logged and kept in stage_metrics.
+
+        :param filter_queries: optional Solr filter queries (fq) restricting the documents.
+        :param cursor: the cursorMark or the start offset to resume from.
+        """
+
+        pages = self.iter_solr_pages(filter_queries, cursor)
+        if not self.solr_prefetch_pages:
+            yield from ((self.process_page(docs), cursor) for docs, cursor in pages)
+            return
+
+        with Prefetcher(pages, self.solr_prefetch_pages, "fetch") as fetch_stage:
+            processed_pages = map(
+                lambda page: (self.process_page(page[0]), page[1]), fetch_stage)
+            with Prefetcher(processed_pages, self.solr_prefetch_pages, "process") as process_stage:
+                yield from process_stage
+                for stage in (fetch_stage, process_stage):
+                    self.stage_metrics[stage.name] = stage.get_metrics()
+                    for name, value in stage.get_metrics().items():
+                        self.metrics.set(f"queue_{name}", value, queue=stage.name)
+                    logging.info(f"Pipeline stage '{stage.name}' -> {stage.get_metrics()}")
+
+    def write_record(self, final_corpus: Union[CorpusWriter, JsonlShardWriter], record: dict) -> None:
+        """
+        Deduplicates a processed record against the documents seen before it and saves
+        it to the final corpus when it is selected and new. The document is counted as
+        accepted, or as rejected with the reason why.
+        """
+
+        self.deduplicate([record])
+        if record["reason"] is None and self.is_new_content(record) \
+                and not self.is_near_duplicate(record):
+            self.save_document(final_corpus, record)
+            self.metrics.increment("documents_accepted")
+        else:
+            self.metrics.increment("documents_rejected", reason=record["reason"])
+
+    def save_document(self, final_corpus: Union[CorpusWriter, JsonlShardWriter], record: dict) -> None:
+        """
+        Save the title, url and the cleaned Tetun lines of a document to the final corpus file,
+        or its output record to the JSONL shards in the "jsonl" output format.
+        """
+
+        with self.metrics.timer("write"):
+            if self.output_format == "jsonl":
+                final_corpus.write_record(get_output_record(record))
+            else:
+                save_text_document(final_corpus, record)
+        self.document_log.debug("accepted", "The content was sucessfully generated for the title -> %s", record["title"])
+
+    def generate_corpus(self) -> None:
+        """
+        (1) Retrieve and load each page of documents from the Solr.
+        (2) Apply the Tetun LID model to the page titles and collect only those with a probability >= threshold.
+        (3) Apply the Tetun LID model to the content lines of the collected documents in one batch.
+        (4) Save title, url and its content that has a proba >= threshold to the final corpus file.
+        (5) Add a newline to the end of each document.
+        """
+
+        logging.info("Getting and loading json data from Solr...")
+        checkpoint = self.load_checkpoint()
+        if checkpoint.get("cursor") is not None:
+            self.restore_checkpoint(checkpoint)
+            cursor = checkpoint["cursor"]
+            started_at, filter_queries = checkpoint["started_at"], checkpoint["filter_queries"]
+        else:
+            self.dedup_index.load()
+            cursor = "*" if self.solr_paging == "cursor" else self.solr_start
+            started_at, filter_queries = get_timestamp(), self.get_since_filter_queries(checkpoint)
+        run_state = {
+            "started_at": started_at,
+            "filter_queries": filter_queries,
+            "last_successful_run": checkpoint.get("last_successful_run")
+        }
+
+        try:
+            with self.open_final_corpus(checkpoint.get("corpus_position")) as final_corpus, \
+                    closing(self.iter_processed_pages(filter_queries, cursor)) as processed_pages:
+                if self.checkpoint_file_path:
+                    self.save_checkpoint(dict(run_state, cursor=cursor, **self.get_output_position(final_corpus)))
+                for page, (records, cursor) in enumerate(processed_pages, 1):
+                    for record in records:
+                        self.write_record(final_corpus, record)
+                    if self.checkpoint_file_path and page % self.checkpoint_pages == 0:
+                        final_corpus.flush()
+                        self.save_checkpoint(dict(run_state, cursor=cursor, **self.get_output_position(final_corpus)))
+        finally:
+            self.dedup_index.save()
+        self.report_near_duplicates()
+        self.save_run(started_at)
 
         logging.info("The final corpus has been generated sucessfully.")
+
+    def open_final_corpus(self, position: dict = None) -> Union[CorpusWriter, JsonlShardWriter]:
+        """
+        Opens the writer of the final corpus, which also writes its offset index, or the writer
+        of the JSONL shards in the "jsonl" output format, resuming the shard at position.
+        """
+
+        if self.output_format == "jsonl":
+            return JsonlShardWriter(
+                self.output_prefix, self.output_shard_size, self.output_compression, self.write_buffer_size, position)
+        return CorpusWriter(
+            self.final_corpus_file_path, self.write_buffer_size, index_file_path=self.final_corpus_index_file_path
+        )
+
+    def get_output_position(self, final_corpus: Union[CorpusWriter, JsonlShardWriter]) -> dict:
+        """Gets the checkpoint entry of the position of the flushed final corpus writer."""
+
+        if self.output_format == "jsonl":
+            return {"corpus_position": final_corpus.get_position()}
+        return {"corpus_offset": final_corpus.offset}
+
+    def export_text(self) -> None:
+        """Exports the JSONL shards to the final corpus file in the text format, replacing it."""
+
+        logging.info(f"Exporting the JSONL shards to -> {self.final_corpus_file_path}")
+        with CorpusWriter(
+            self.final_corpus_file_path, self.write_buffer_size, append=False,
+            index_file_path=self.final_corpus_index_file_path
+        ) as final_corpus:
+            for record in iter_jsonl_records(self.output_prefix):
+                save_text_document(final_corpus, record)
+
+    def load_checkpoint(self) -> dict:
+        """Loads the checkpoint of the corpus construction, or {} if there is none."""
+
+        if not self.checkpoint_file_path or not os.path.exists(self.checkpoint_file_path) \
+                or os.path.getsize(self.checkpoint_file_path) == 0:
+            return {}
+        with open(self.checkpoint_file_path, "r", encoding="utf-8") as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def save_checkpoint(self, checkpoint: dict) -> None:
+        """
+        Saves the deduplication state and then the checkpoint, atomically. The checkpoint
+        holds the Solr cursor of the next page, the size of the final corpus and of the
+        deduplication index at that point, the filter queries and the run start time.
+        """
+
+        self.dedup_index.save()
+        index_file_path = self.dedup_index.index_file_path
+        if index_file_path is not None:
+            checkpoint["dedup_index_size"] = os.path.getsize(index_file_path) if os.path.exists(index_file_path) else 0
+        if self.near_dup_filter is not None:
+            self.near_dup_filter.save(f"{self.checkpoint_file_path}.near_dup.npy")
+
+        with open(f"{self.checkpoint_file_path}.tmp", "w", encoding="utf-8") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(f"{self.checkpoint_file_path}.tmp", self.checkpoint_file_path)
+        logging.info(f"Checkpoint saved -> {checkpoint['cursor']}")
+
+    def restore_checkpoint(self, checkpoint: dict) -> None:
+        """
+        Restores the state of an interrupted run: the final corpus and its offset index (or the
+        JSONL shards) and the deduplication index are truncated back to their size at the
+        checkpoint, dropping what was written afterwards, and the deduplication state is reloaded.
+        """
+
+        logging.info(f"Resuming the corpus construction from the checkpoint -> {checkpoint['cursor']}")
+        if "corpus_position" in checkpoint:
+            truncate_jsonl_shards(self.output_prefix, checkpoint["corpus_position"])
+        else:
+            if os.path.getsize(self.final_corpus_file_path) > checkpoint["corpus_offset"]:
+                os.truncate(self.final_corpus_file_path, checkpoint["corpus_offset"])
+            truncate_corpus_index(self.final_corpus_index_file_path, checkpoint["corpus_offset"])
+        if "dedup_index_size" in checkpoint and os.path.exists(self.dedup_index.index_file_path) \
+                and os.path.getsize(self.dedup_index.index_file_path) > checkpoint["dedup_index_size"]:
+            os.truncate(self.dedup_index.index_file_path, checkpoint["dedup_index_size"])
+        self.dedup_index.load()
+        near_dup_state_file_path = f"{self.checkpoint_file_path}.near_dup.npy"
+        if self.near_dup_filter is not None and os.path.exists(near_dup_state_file_path):
+            self.near_dup_filter.load(near_dup_state_file_path)
+
+    def save_run(self, started_at: str) -> None:
+        """Replaces the checkpoint with the start time of the successful run."""
+
+        if not self.checkpoint_file_path:
+            return
+        with open(f"{self.checkpoint_file_path}.tmp", "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"last_successful_run": started_at}, checkpoint_file)
+        os.replace(f"{self.checkpoint_file_path}.tmp", self.checkpoint_file_path)
+        near_dup_state_file_path = f"{self.checkpoint_file_path}.near_dup.npy"
+        if os.path.exists(near_dup_state_file_path):
+            os.remove(near_dup_state_file_path)
+
+    def get_since_filter_queries(self, checkpoint: dict) -> List[str]:
+        """
+        Gets the filter query restricting the documents to those fetched by Nutch (tstamp)
+        after the since timestamp, or after the last successful run when since is "last".
+        """
+
+        since = self.since
+        if since == "last":
+            since = checkpoint.get("last_successful_run")
+            if since is None:
+                logging.info("No previous successful run, processing all the documents.")
+        if not since:
+            return []
+        logging.info(f"Processing the documents fetched after -> {since}")
+
+        return [f"tstamp:{{{since} TO *]"]
+
+    def get_shard_file_path(self, shard_index: int, total_shards: int) -> str:
+        """Gets the path of the intermediate file of a shard of the final corpus."""
+
+        return f"{self.final_corpus_file_path}.shard-{shard_index:05d}-of-{total_shards:05d}"
+
+    def generate_shard(
+        self, shard_index: int, total_shards: int, filter_queries: List[str] = None
+    ) -> Tuple[str, dict]:
+        """
+        Processes the Solr documents of one hash partition of the collection and saves
+        their records, in the id order, to the shard file. Only the documents already in
+        the loaded deduplication index are skipped here; the deduplication within the run is
+        left to merge_shards, which sees the whole collection.
+
+        :param shard_index: the partition to process, from 0 to total_shards - 1.
+        :param total_shards: the number of partitions of the collection.
+        :param filter_queries: optional Solr filter queries (fq) restricting the documents.
+        :return: the shard file path and the metrics report of the shard.
+        """
+
+        if self.solr_paging != "cursor":
+            raise ValueError("Sharded corpus construction requires the cursor paging mode.")
+
+        self.metrics = Metrics(self.metrics.stage)  # Only the metrics of this shard go back to the parent
+        shard_file_path = self.get_shard_file_path(shard_index, total_shards)
+        filter_queries = (filter_queries or []) + [
+            f"{{!hash workers={total_shards} worker={shard_index} partitionKeys=id}}"]
+        logging.info(f"Generating the shard {shard_index + 1}/{total_shards}...")
+        with CorpusWriter(shard_file_path, self.write_buffer_size, append=False) as shard_file, \
+                closing(self.iter_processed_pages(filter_queries)) as processed_pages:
+            for records, _ in processed_pages:
+                for record in records:
+                    shard_file.save_corpus(json.dumps(record, ensure_ascii=False))
+                shard_file.end_document()
+
+        return shard_file_path, self.metrics.to_dict()
+
+    def generate_corpus_parallel(self, workers: int, shard: Tuple[int, int] = (0, 1)) -> None:
+        """
+        Generates the shard files of this machine with a pool of worker processes. The
+        collection is split into shard[1] * workers hash partitions and this machine, i.e.
+        shard[0], processes the workers partitions starting at shard[0] * workers.
+        When the whole collection is processed here, the shards are merged right away.
+        The shard files left by an interrupted run are complete, so they are not generated again.
+
+        :param workers: the number of worker processes.
+        :param shard: the (index, total) of the machine shard.
+        """
+
+        shard_index, total_machine_shards = shard
+        total_shards = total_machine_shards * workers
+        shard_indexes = [shard_index * workers + worker for worker in range(workers)]
+        shard_indexes = [
+            index for index in shard_indexes
+            if not os.path.exists(self.get_shard_file_path(index, total_shards))
+        ]
+        started_at = get_timestamp()
+        filter_queries = self.get_since_filter_queries(self.load_checkpoint())
+        self.dedup_index.load()
+
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            futures = [
+                executor.submit(self.generate_shard, index, total_shards, filter_queries)
+                for index in shard_indexes
+            ]
+            for future in as_completed(futures):
+                shard_file_path, shard_metrics = future.result()
+                self.metrics.merge(shard_metrics)
+                logging.info(f"The shard file was generated -> {shard_file_path}")
+
+        if total_machine_shards == 1:
+            self.merge_shards()
+            self.save_run(started_at)
+
+    def merge_shards(self) -> None:
+        """
+        Merges the shard files into the final corpus. The records are merged in the id order
+        and deduplicated exactly like in generate_corpus, so the final corpus is the same as
+        the one of a serial run. The shard files are removed once the merge succeeds.
+        """
+
+        shard_file_paths = sorted(
+            path for path in glob.glob(f"{glob.escape(str(self.final_corpus_file_path))}.shard-*-of-*")
+            if not path.endswith(".tmp")
+        )
+        if not shard_file_paths:
+            raise FileNotFoundError(f"No shard files found for: {self.final_corpus_file_path}")
+        total_shards = {int(path.rsplit("-of-", 1)[1]) for path in shard_file_paths}
+        if len(total_shards) != 1 or len(shard_file_paths) != total_shards.pop():
+            raise ValueError(f"Incomplete or mixed set of shard files: {shard_file_paths}")
+
+        logging.info(f"Merging {len(shard_file_paths)} shard files...")
+        shard_files = [open(path, "r", encoding="utf-8") for path in shard_file_paths]
+        try:
+            records = heapq.merge(
+                *[map(json.loads, shard_file) for shard_file in shard_files],
+                key=lambda record: record["id"]
+            )
+            self.dedup_index.load()
+            with self.open_final_corpus() as final_corpus:
+                for record in records:
+                    self.write_record(final_corpus, record)
+        finally:
+            self.dedup_index.save()
+            for shard_file in shard_files:
+                shard_file.close()
+        self.report_near_duplicates()
+
+        for path in shard_file_paths:
+            os.remove(path)
+        logging.info("The final corpus has been generated sucessfully.")
+
+
+def save_text_document(final_corpus: CorpusWriter, record: dict) -> None:
+    """Writes the title, url and lines of a document in the text format of the final corpus."""
+
+    final_corpus.save_corpus(record["title"].strip())
+    final_corpus.save_corpus(record["url"].strip())
+    for text_line in record["lines"]:
+        final_corpus.save_corpus(text_line)
+    final_corpus.end_document()
+
+
+def get_output_record(record: dict) -> dict:
+    """
+    Gets the JSONL output record of a saved document: its Solr id, title, url, domain, lines
+    (as in the text format, with the empty lines) and the Tetun probabilities of its title and
+    its accepted content lines (mean).
+    """
+
+    url = record["url"].strip()
+    return {
+        "id": record["id"],
+        "title": record["title"].strip(),
+        "url": url,
+        "domain": extract_domain(url),
+        "lines": record["lines"],
+        "lid": {"title": record.get("lid_title"), "content": record.get("lid_content")}
+    }
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    Parses a shard given as "i/N" into (i, N).
+
+    :param shard: the shard, e.g. "0/4" for the first of four shards.
+    :return: the shard index and the total of shards.
+    """
+
+    try:
+        shard_index, total_shards = (int(value) for value in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{shard}', expected 'i/N'.")
+    if total_shards < 1 or not 0 <= shard_index < total_shards:
+        raise ValueError(f"Invalid shard '{shard}', expected 0 <= i < N.")
+
+    return shard_index, total_shards
+
+
+def parse_since(since: str) -> str:
+    """
+    Parses the since value of an incremental run: "last", or an ISO timestamp (a date, or a
+    date and time with an optional UTC offset, UTC by default) converted to the Solr date format.
+
+    :param since: "last" or the ISO timestamp, e.g. "2025-01-01" or "2025-01-01T00:00:00+00:00".
+    :return: "last" or the UTC timestamp in the Solr date format.
+    """
+
+    if since == "last":
+        return since
+    try:
+        timestamp = datetime.fromisoformat(str(since).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid since '{since}', expected 'last' or an ISO timestamp, e.g. 2025-01-01T00:00:00Z.")
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+    return timestamp.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def get_timestamp() -> str:
+    """Gets the current UTC time in the Solr date format."""
+
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -1,7 +1,9 @@
+import mmap
 import random
 from pathlib import Path
 from typing import List
-from common_utils.utils import Utils
+from common_utils.corpus_index import build_corpus_index, get_index_file_path, is_valid_corpus_index, load_corpus_index
+from common_utils.metrics import Metrics
 
 #!/usr/bin/env python
 #
@@ -20,20 +22,55 @@ class GetSampleCorpus:
         total_sample: int,
         total_text_pages: int
     ) -> None:
-        self.load_corpus = Utils(corpus_file_path)
+        self.corpus_file_path = corpus_file_path
+        self.corpus_index_file_path = get_index_file_path(corpus_file_path)
         self.corpus_sample_dir_path = corpus_sample_dir_path
         self.total_sample = total_sample
         self.total_text_pages = total_text_pages
+        self.metrics = Metrics("sample")
+
+    def get_samples(self) -> List[List[str]]:
+        """
+        Draws total_sample independent random samples of total_text_pages text pages. The
+        offset index of the corpus (built first if it is missing or stale) is memory-mapped
+        along with the corpus, so only the sampled text pages are read.
+        """
+
+        try:
+            if not is_valid_corpus_index(self.corpus_file_path, self.corpus_index_file_path):
+                print(f"Building the offset index of the corpus: {self.corpus_index_file_path}")
+                with self.metrics.timer("index_build"):
+                    build_corpus_index(self.corpus_file_path, self.corpus_index_file_path)
+            index = load_corpus_index(self.corpus_index_file_path)
+        except FileNotFoundError:
+            print(f"File not found at: {self.corpus_file_path}")
+            return []
+        if len(index) < self.total_text_pages:
+            raise ValueError("Sample larger than population or is negative")
+        self.metrics.set("corpus_documents", len(index))
+
+        samples = []
+        with self.metrics.timer("sample"), open(self.corpus_file_path, "rb") as corpus_file, \
+                mmap.mmap(corpus_file.fileno(), 0, access=mmap.ACCESS_READ) as corpus:
+            for _ in range(self.total_sample):
+                sample = []
+                for i in random.sample(range(len(index)), self.total_text_pages):
+                    offset, length = int(index[i, 0]), int(index[i, 1])
+                    sample.append(corpus[offset:offset + length].decode("utf-8").rstrip("\n"))
+                samples.append(sample)
+                self.metrics.increment("text_pages_sampled", len(sample))
+
+        return samples
 
     def generate_sample(self) -> List[str]:
-        corpus = self.load_corpus.load_sample_corpus()
-        for i in range(1, self.total_sample+1, 1):
-            ramdom_contents = "\n\n".join(
-                random.sample(corpus, self.total_text_pages))
+        samples = self.get_samples()
+        for i, sample in enumerate(samples, 1):
+            ramdom_contents = "\n\n".join(sample)
             sample_path = f"{self.corpus_sample_dir_path}/sample_{i}.txt"
             try:
-                with open(sample_path, 'w', encoding='utf-8') as f_sample:
+                with self.metrics.timer("write"), open(sample_path, 'w', encoding='utf-8') as f_sample:
                     f_sample.write(ramdom_contents)
+                self.metrics.increment("samples_written")
             except FileNotFoundError:
                 print(f"Folder not found at: {self.corpus_sample_dir_path}")
                 return []
@@ -1,8 +1,8 @@
-import re
 from pathlib import Path
 from typing import List
-from googlesearch import search
-from common_utils.utils import Utils, extract_domain
+from common_utils.search_backend import GoogleSearchBackend, SearchFanOut
+from common_utils.url_filter import UrlFilter
+from common_utils.utils import CorpusWriter, Utils, extract_domain, extract_domains
 
 #!/usr/bin/env python
 #
@@ -27,19 +27,31 @@ class GetSeedUrl:
         self,
         extension_to_exclude: List[str],
         domains_to_exclude: List[str],
-        generate_seed_words: callable,
         google_search_num_result: int,
         max_seed_url_length: int,
         nutch_seed_url_file_path: Path,
         domain_file_path: Path,
+        search_fan_out: SearchFanOut = None,
     ) -> None:
-        self.extension_to_exclude = extension_to_exclude
-        self.domains_to_exclude = domains_to_exclude
-        self.generate_seed_words = generate_seed_words
+        self.url_filter = UrlFilter(extension_to_exclude, domains_to_exclude)
         self.google_search_num_result = google_search_num_result
         self.max_seed_url_length = max_seed_url_length
+        self.nutch_seed_url_file_path = nutch_seed_url_file_path
+        self.domain_file_path = domain_file_path
         self.nutch_seed_url_file = Utils(nutch_seed_url_file_path)
         self.domain_file = Utils(domain_file_path)
+        self.search_fan_out = search_fan_out or SearchFanOut(GoogleSearchBackend())
+        self.seed_url_index = None
+        self.domain_index = None
+
+    def load_indexes(self) -> None:
+        """
+        Loads the seed url and domain files once into in-memory set indexes, which are then
+        updated in place as new seed urls and domains are saved.
+        """
+
+        self.seed_url_index = set(self.nutch_seed_url_file.load_corpus())
+        self.domain_index = set(self.domain_file.load_corpus())
 
     def is_allowed_seed_url(self, seed_url: str) -> bool:
         """
@@ -50,9 +62,7 @@ class GetSeedUrl:
         :return: True if the url is allowed, False otherwise.
         """
 
-        is_allowed = not any(
-            re.search(ext, seed_url.lower()) for ext in self.extension_to_exclude
-        ) and not any(domain in seed_url for domain in self.domains_to_exclude)
+        is_allowed = self.url_filter.is_allowed(seed_url)
 
         return is_allowed
 
@@ -64,7 +74,9 @@ class GetSeedUrl:
         :return: True if the url is new, False otherwise.
         """
 
-        new_seed_url = seed_url not in self.nutch_seed_url_file.load_corpus()
+        if self.seed_url_index is None:
+            self.load_indexes()
+        new_seed_url = seed_url not in self.seed_url_index
 
         return new_seed_url
 
@@ -76,49 +88,81 @@ class GetSeedUrl:
         :return: True if the URL's domain contains any of the domains, False otherwise.
         """
 
+        if self.domain_index is None:
+            self.load_indexes()
         domain = extract_domain(seed_url)
-        new_domain = domain not in self.domain_file.load_corpus()
+        new_domain = domain not in self.domain_index
 
         return new_domain
 
-    def get_seed_urls(self) -> List[str]:
+    def search(self, seed_queries: List[str]) -> List[List[str]]:
+        """
+        Searches the seed queries concurrently, within the rate limit of the search backend.
+
+        :param seed_queries: a list of seed queries.
+        :return: the list of result urls of each query.
+        """
+
+        return self.search_fan_out.search_many(seed_queries, self.google_search_num_result)
+
+    def get_seed_urls(
+        self, nutch_seed_url_file: CorpusWriter, seed_words: str, search_results: List[str] = None
+    ) -> List[str]:
         """
         Gets new seeds having length < 300 and save them into the seed file 
         and return a list of seed URLs.
+
+        :param nutch_seed_url_file: the writer of the Nutch seed url file.
+        :param seed_words: the search query.
+        :param search_results: the result urls of the query, if it was already searched.
         """
 
+        if search_results is None:
+            search_results = self.search([seed_words])[0]
         seeds_urls = set()
-        for url in search(self.generate_seed_words, num_results=self.google_search_num_result):
-            if self.is_allowed_seed_url(url) and self.is_new_seed_url(url):
+        for url in search_results:
+            if url not in seeds_urls and self.is_allowed_seed_url(url) and self.is_new_seed_url(url):
                 seeds_urls.add(url)
                 if len(url) < self.max_seed_url_length:
-                    self.nutch_seed_url_file.save_corpus(url)
+                    nutch_seed_url_file.save_corpus(url)
+                    nutch_seed_url_file.end_document()
+                    self.seed_url_index.add(url)
 
         return list(seeds_urls)
 
-    def get_domains(self, seed_urls: List[str]) -> List[str]:
+    def get_domains(self, seed_urls: List[str], domain_file: CorpusWriter) -> List[str]:
         """
         Gets new domains from the seed URLs.
 
         :param seeds: a list of the seed URLs.
+        :param domain_file: the writer of the domain file.
         :return: a list of domains.
         """
 
         domains = set()
-        for seed_url in seed_urls:
-            domain = extract_domain(seed_url)
-            if domain:
+        for seed_url, domain in zip(seed_urls, extract_domains(seed_urls)):
+            if domain and domain not in domains:
                 if self.is_new_domain(seed_url):
                     domains.add(domain)
-                    self.domain_file.save_corpus(domain)
+                    domain_file.save_corpus(domain)
+                    domain_file.end_document()
+                    self.domain_index.add(domain)
 
         return list(domains)
 
-    def generate_seed_urls(self) -> None:
-        """Gets seed urls returned by the Google search and their respective domains."""
+    def generate_seed_urls(self, seed_words: str, search_results: List[str] = None) -> None:
+        """
+        Gets seed urls returned by the search backend and their respective domains.
+        The seed url and domain indexes are loaded on the first call and kept up to date.
+
+        :param seed_words: the search query.
+        :param search_results: the result urls of the query, if it was already searched.
+        """
 
-        seed_urls = self.get_seed_urls()
-        domains = self.get_domains(seed_urls)
+        with CorpusWriter(self.nutch_seed_url_file_path) as nutch_seed_url_file:
+            seed_urls = self.get_seed_urls(nutch_seed_url_file, seed_words, search_results)
+        with CorpusWriter(self.domain_file_path) as domain_file:
+            domains = self.get_domains(seed_urls, domain_file)
 
         print(f"\nNew url(s):\n" + "\n".join(seed_urls))
         print(f"\nNew domain(s):\n" + "\n".join(domains))
@@ -4,8 +4,10 @@ from pathlib import Path
 from collections import Counter
 from tetuntokenizer.tokenizer import TetunWordTokenizer
 from typing import List, Dict
+from common_utils.lid_cache import LidVerdictCache
 from common_utils.tetun_lid import TetunLid
-from common_utils.utils import Utils
+from common_utils.utils import CorpusWriter, Utils
+from common_utils.weighted_sampler import WeightedSampler
 
 #!/usr/bin/env python
 #
@@ -33,6 +35,8 @@ class GetSeedWords:
         lang_proba_threshold: float,
         num_seed_words_sample: int,
         seed_words_file_path: Path,
+        lid_mmap_mode: str = None,
+        lid_verdict_cache_file_path: Path = None,
     ) -> None:
         self.main_corpus = Utils(main_corpus_file_path)
         self.corpus_sample_ratio = corpus_sample_ratio
@@ -42,7 +46,10 @@ class GetSeedWords:
         self.seed_words_file = Utils(seed_words_file_path)
         self.tetun_lang = tetun_lang
         self.tetun_lid = TetunLid(
-            self.tetun_lang, self.lang_proba_threshold, lid_model_file_path
+            self.tetun_lang, self.lang_proba_threshold, lid_model_file_path, lid_mmap_mode
+        )
+        self.lid_verdict_cache = LidVerdictCache(
+            lid_verdict_cache_file_path, lid_model_file_path, self.tetun_lang, self.lang_proba_threshold
         )
 
     def get_sample_corpus(self) -> List[str]:
@@ -83,33 +90,48 @@ class GetSeedWords:
         return a dictionary contains words and their distribution probability.
         """
 
-        # Apply the Tetun LID model to the tokenized words
-        words = self.tetun_lid.get_tetun_text(self.tokenize_sample_corpus())
+        token_counts = Counter(self.tokenize_sample_corpus())
+
+        # Apply the Tetun LID model to the unique tokens without a cached verdict only
+        self.lid_verdict_cache.load()
+        unknown_tokens = self.lid_verdict_cache.get_unknown_tokens(list(token_counts))
+        self.lid_verdict_cache.update(unknown_tokens, self.tetun_lid.get_tetun_mask(unknown_tokens))
+        self.lid_verdict_cache.save()
+        print(f"LID applied to {len(unknown_tokens)} of {len(token_counts)} unique tokens.")
 
-        freq_dict = Counter(words)
-        total_words = len(words)
+        freq_dict = {
+            word: count for word, count in token_counts.items() if self.lid_verdict_cache.is_accepted(word)
+        }
+        total_words = sum(freq_dict.values())
         probs_dist = {word: count / total_words for word, count in freq_dict.items()}
 
         return probs_dist
 
+    def generate_seed_queries(self, num_queries: int = 1) -> List[str]:
+        """
+        Samples num_queries independent queries of unique words from a single probability
+        distribution, save them into the seed file and return them in a list of strings.
+
+        :param num_queries: the number of queries.
+        :return: a list of seed queries.
+        """
+
+        proba_dist = self.calculate_proba_distribution()
+        sampler = WeightedSampler(list(proba_dist.keys()), list(proba_dist.values()))
+        seed_queries = [" ".join(words) for words in sampler.sample_many(num_queries, self.num_seed_words_sample)]
+
+        with CorpusWriter(self.seed_words_file.file_path) as seed_words_file:
+            for seeds in seed_queries:
+                seed_words_file.save_corpus(seeds)
+                seed_words_file.end_document()
+                print(f"Seed words: {seeds}")
+
+        return seed_queries
+
     def generate_seed_words(self) -> str:
         """
         Samples three unique words and save them into the seed file
         and return a string of sampled words.
         """
 
-        proba_dist = self.calculate_proba_distribution()
-        sequence_words = list(proba_dist.keys())
-        weights = list(proba_dist.values())
-        samples = set()
-        while len(samples) < self.num_seed_words_sample:
-            sample = random.choices(sequence_words, weights)[0]
-            samples.add(sample)
-            sequence_words.remove(sample)
-            weights.remove(proba_dist[sample])
-
-        seeds = " ".join(list(samples))
-        self.seed_words_file.save_corpus(seeds)
-        print(f"Seed words: {seeds}")
-
-        return seeds
+        return self.generate_seed_queries(1)[0]
@@ -1,6 +1,7 @@
 import hydra
 from hydra.core.config_store import ConfigStore
 from common_utils.config import PipelineConfig
+from common_utils.metrics import get_profile_file_path, get_report_file_path, profile_stage
 from common_utils.utils import get_file_path
 from src.collection_stat import CollectionStatistic
 import warnings
@@ -21,11 +22,26 @@ class ViewCollectionStatistic:
         self.collection_stat = CollectionStatistic(
             get_file_path(cfg.paths.data, cfg.files.final_corpus),
             get_file_path(cfg.paths.data, cfg.files.url_in_out_links),
-            get_file_path(cfg.paths.data, cfg.files.stats_in_out_links)
+            get_file_path(cfg.paths.data, cfg.files.stats_in_out_links),
+            {
+                "max_workers": cfg.params.link_fetch_workers,
+                "max_per_host": cfg.params.link_fetch_per_host,
+                "connect_timeout": cfg.params.link_fetch_connect_timeout,
+                "read_timeout": cfg.params.link_fetch_read_timeout,
+                "total_timeout": cfg.params.link_fetch_total_timeout,
+                "max_body_bytes": cfg.params.link_fetch_max_bytes,
+            },
+            cfg.params.stats_source,
+            cfg.paths.nutch_linkdb_dump,
+            cfg.paths.nutch_segment_dump
         )
+        self.metrics_file_path = get_report_file_path(cfg.paths.metrics, "stats", cfg.params.metrics_format)
 
     def run(self) -> None:
-        self.collection_stat.generate_stats()
+        try:
+            self.collection_stat.generate_stats()
+        finally:
+            self.collection_stat.metrics.save(self.metrics_file_path)
 
 
 cs = ConfigStore.instance()
@@ -34,6 +50,7 @@ if __name__ == "__main__":
     @hydra.main(config_path="conf", config_name="config")
     def main(cfg: PipelineConfig):
         generate_stat = ViewCollectionStatistic(cfg)
-        generate_stat.run()
+        with profile_stage(get_profile_file_path(cfg.paths.metrics, "stats", cfg.params.profile_stages)):
+            generate_stat.run()
 
     main()